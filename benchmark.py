@@ -0,0 +1,722 @@
+import io
+import sys
+import json
+import time
+import math
+import random
+import argparse
+import resource
+import contextlib
+import multiprocessing
+
+from collections import namedtuple
+from datetime import datetime, timedelta
+from string import ascii_lowercase, ascii_uppercase
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import day1
+import day2
+import day3
+import day4
+import day5
+import day6
+import day7
+import day8
+import day9
+import day10
+import day12
+import day13
+import day14
+import day15
+import day16
+import day17
+import day18
+import day20
+import day22
+import day23
+import day24
+import day25
+
+
+"""
+Every benchmark consists of a generator which builds an input for the puzzle
+at the requested scale, i.e. a scale of 10 produces an input ten times the
+size of the shipped input, and a function which runs the public functions of
+the day against the generated input. Only the latter is timed.
+
+Day 11 is not benchmarked since its 300x300 grid is hard-coded, and days 19
+and 21 are elfcode programs whose running time depends on the program rather
+than on the size of any input.
+"""
+Benchmark = namedtuple('Benchmark', 'day, name, generate, run')
+Generator = Callable[[int, random.Random], Tuple]
+
+BENCHMARKS: List[Benchmark] = []
+DEFAULT_SCALES = (1, 10, 100)
+
+
+def benchmark(day: int, name: str, generate: Generator) -> Callable:
+    """
+    Registers the decorated function as the benchmark for the day
+    """
+    def register(run: Callable) -> Callable:
+        BENCHMARKS.append(Benchmark(day, name, generate, run))
+        return run
+    return register
+
+
+def side(length: int, scale: int) -> int:
+    """
+    Returns the side length of a square grid with scale times the area of a
+    grid with the given side length
+    """
+    return int(length * math.sqrt(scale))
+
+
+def generate_frequencies(scale: int, rng: random.Random) -> Tuple:
+    return ([rng.randint(-20, 20) for _ in range(1000 * scale)],)
+
+
+def generate_repeating_frequencies(scale: int, rng: random.Random) -> Tuple:
+    """
+    Returns changes whose first pass reaches no frequency twice and drifts
+    by a non-zero amount, so the first repeated frequency is only reached
+    after several passes just like with the real input
+    """
+    count = 1000 * scale
+    drift = 2 * count
+
+    # Frequencies with distinct residues modulo the drift never meet in any
+    # pass, except for the planted pair which is whole passes apart
+    residues = rng.sample(range(1, drift), count - 1)
+    reached = [residue + drift * rng.randint(-5, 5) for residue in residues]
+    reached[-1] = reached[0] + drift * rng.randint(5, 10)
+    rng.shuffle(reached)
+    reached.append(drift)
+
+    return ([b - a for a, b in zip([0] + reached, reached)],)
+
+
+@benchmark(1, 'apply_frequencies', generate_repeating_frequencies)
+def run_day1(frequencies: List[int]) -> None:
+    for _ in day1.apply_frequencies(frequencies):
+        pass
+
+    current = 0
+    previous = set()
+    while True:
+        for current in day1.apply_frequencies(frequencies, current):
+            if current in previous:
+                return
+            previous.add(current)
+
+
+@benchmark(1, 'first_repeated_frequency', generate_repeating_frequencies)
+def run_day1_closed_form(frequencies: List[int]) -> None:
+    day1.first_repeated_frequency(frequencies)
+
+
+def generate_frequency_log(scale: int, rng: random.Random) -> Tuple:
+    frequencies, = generate_frequencies(scale, rng)
+    return (''.join(f'{frequency:+d}\n' for frequency in frequencies).encode(),)
+
+
+@benchmark(1, 'read_blocks', generate_frequency_log)
+def run_day1_streaming(log: bytes) -> None:
+    for _ in day1.accumulate_blocks(day1.read_blocks(io.BytesIO(log))):
+        pass
+
+
+def generate_boxes(scale: int, rng: random.Random) -> Tuple:
+    boxes = [''.join(rng.choice(ascii_lowercase) for _ in range(26))
+             for _ in range(250 * scale)]
+
+    # Plant the prototype box at the very end so the whole input is searched
+    prototype = list(boxes[-1])
+    position = rng.randrange(len(prototype))
+    prototype[position] = 'a' if prototype[position] != 'a' else 'b'
+    boxes.append(''.join(prototype))
+    return (boxes,)
+
+
+@benchmark(2, 'find_common_name_for_boxes', generate_boxes)
+def run_day2(boxes: List[str]) -> None:
+    for box in boxes:
+        day2.generate_checksum_components(box)
+    day2.find_common_name_for_boxes(boxes)
+
+
+@benchmark(2, 'find_similar_boxes', generate_boxes)
+def run_day2_indexed(boxes: List[str]) -> None:
+    day2.find_common_name_for_similar_boxes(boxes)
+
+
+def generate_box_buffer(scale: int, rng: random.Random) -> Tuple:
+    boxes, = generate_boxes(scale, rng)
+    return (''.join(box + '\n' for box in boxes).encode(),)
+
+
+@benchmark(2, 'count_checksum_components', generate_box_buffer)
+def run_day2_buffer(buffer: bytes) -> None:
+    day2.count_checksum_components(buffer)
+
+
+def generate_claims(scale: int, rng: random.Random) -> Tuple:
+    fabric = side(1000, scale)
+    claims = []
+    for i in range(1, 1300 * scale + 1):
+        width, height = rng.randint(10, 29), rng.randint(10, 29)
+        x, y = rng.randrange(fabric - width), rng.randrange(fabric - height)
+        claims.append(f'#{i} @ {x},{y}: {width}x{height}')
+    return (claims,)
+
+
+@benchmark(3, 'intersect_claims', generate_claims)
+def run_day3(claims: List[str]) -> None:
+    day3.intersect_claims([day3.parse_claim(claim) for claim in claims])
+
+
+@benchmark(3, 'overlap_rectangles', generate_claims)
+def run_day3_rectangles(claims: List[str]) -> None:
+    day3.overlap_rectangles([day3.parse_rectangle(claim) for claim in claims])
+
+
+@benchmark(3, 'sweep_rectangles', generate_claims)
+def run_day3_sweep(claims: List[str]) -> None:
+    day3.sweep_rectangles([day3.parse_rectangle(claim) for claim in claims])
+
+
+def generate_guard_records(scale: int, rng: random.Random) -> Tuple:
+    records = []
+    start = datetime(1518, 1, 1, 23, 58)
+    for night in range(250 * scale):
+        shift = start + timedelta(days=night)
+        records.append(f'[{shift:%Y-%m-%d %H:%M}] '
+                       f'Guard #{rng.randrange(10, 3000, 10)} begins shift')
+
+        # Naps take place between midnight and 00:59
+        midnight = shift + timedelta(minutes=2)
+        minutes = sorted(rng.sample(range(1, 60), 2 * rng.randint(1, 2)))
+        for asleep, awake in zip(minutes[::2], minutes[1::2]):
+            asleep_at = midnight + timedelta(minutes=asleep)
+            awake_at = midnight + timedelta(minutes=awake)
+            records.append(f'[{asleep_at:%Y-%m-%d %H:%M}] falls asleep')
+            records.append(f'[{awake_at:%Y-%m-%d %H:%M}] wakes up')
+
+    rng.shuffle(records)
+    return (records,)
+
+
+@benchmark(4, 'sleepiest_guard', generate_guard_records)
+def run_day4(raw_records: List[str]) -> None:
+    records = sorted(day4.parse_records(raw_records), key=lambda rec: rec.time)
+    day4.sleepiest_guard(records, strategy=1)
+    day4.sleepiest_guard(records, strategy=2)
+
+
+@benchmark(4, 'sleep_histograms', generate_guard_records)
+def run_day4_histograms(raw_records: List[str]) -> None:
+    histograms = day4.sleep_histograms(sorted(raw_records, key=day4.timestamp))
+    day4.sleepiest_guard_in_histograms(histograms, strategy=1)
+    day4.sleepiest_guard_in_histograms(histograms, strategy=2)
+
+
+@benchmark(4, 'sort_externally', generate_guard_records)
+def run_day4_external(raw_records: List[str]) -> None:
+    histograms = day4.sleep_histograms(day4.sort_externally(raw_records, 10000))
+    day4.sleepiest_guard_in_histograms(histograms, strategy=1)
+    day4.sleepiest_guard_in_histograms(histograms, strategy=2)
+
+
+def generate_polymer(scale: int, rng: random.Random) -> Tuple:
+    units: List[str] = []
+    for _ in range(50000 * scale):
+        # Mix in reacting units so the polymer actually collapses
+        if units and rng.random() < 0.3:
+            units.append(units[-1].swapcase())
+        else:
+            unit = rng.choice(ascii_lowercase)
+            units.append(unit.upper() if rng.random() < 0.5 else unit)
+    return (''.join(units) + '\n',)
+
+
+@benchmark(5, 'trigger_reactions', generate_polymer)
+def run_day5(polymer: str) -> None:
+    day5.trigger_reactions(polymer)
+
+
+@benchmark(5, 'rank_removals', generate_polymer)
+def run_day5_removals(polymer: str) -> None:
+    day5.rank_removals(polymer)
+
+
+@benchmark(5, 'react_stream', generate_polymer)
+def run_day5_stream(polymer: str) -> None:
+    day5.react_stream(io.BytesIO(polymer.encode()))
+
+
+def generate_coords(scale: int, rng: random.Random) -> Tuple:
+    size = side(350, scale)
+    coords = set()
+    while len(coords) < 50 * scale:
+        coords.add(day6.Coord(rng.randrange(size), rng.randrange(size)))
+
+    # The safe region should stay roughly the same shape at every scale
+    tolerance = int(10000 * scale * math.sqrt(scale))
+    return (list(coords), tolerance)
+
+
+@benchmark(6, 'largest_finite_area', generate_coords)
+def run_day6(coords: List[day6.Coord], tolerance: int) -> None:
+    day6.largest_finite_area(coords)
+    day6.area_near_locations(coords, tolerance)
+
+
+@benchmark(6, 'label_nearest', generate_coords)
+def run_day6_labels(coords: List[day6.Coord], tolerance: int) -> None:
+    day6.largest_finite_area_by_labels(coords)
+
+
+@benchmark(6, 'distance_sums', generate_coords)
+def run_day6_axis(coords: List[day6.Coord], tolerance: int) -> None:
+    day6.area_near_locations_by_axis(coords, tolerance)
+
+
+def generate_steps(scale: int, rng: random.Random) -> Tuple:
+    """
+    The step parser only supports single uppercase letters so the amount of
+    dependencies is capped by the 325 edges of a complete graph of 26 steps
+    """
+    order = list(ascii_uppercase)
+    rng.shuffle(order)
+    edges = [(a, b) for i, a in enumerate(order) for b in order[i + 1:]]
+    edges = rng.sample(edges, min(101 * scale, len(edges)))
+    return ([f'Step {a} must be finished before step {b} can begin.'
+             for a, b in edges],)
+
+
+@benchmark(7, 'execute_steps', generate_steps)
+def run_day7(raw_steps: List[str]) -> None:
+    day7.execute_steps(day7.parse_steps(raw_steps))
+    day7.execute_steps_in_parallel(day7.parse_steps(raw_steps))
+
+
+def generate_named_steps(scale: int, rng: random.Random) -> Tuple:
+    """
+    The graph parser supports any step names so the graph grows with scale
+    """
+    order = [f'S{i}' for i in range(1000 * scale)]
+    rng.shuffle(order)
+    edges = []
+    for i, post in enumerate(order[1:], 1):
+        for pre in set(rng.randrange(i) for _ in range(3)):
+            edges.append((order[pre], post))
+    return ([f'Step {a} must be finished before step {b} can begin.'
+             for a, b in edges],)
+
+
+@benchmark(7, 'topological_order', generate_named_steps)
+def run_day7_graph(raw_steps: List[str]) -> None:
+    day7.topological_order(day7.parse_graph(raw_steps))
+
+
+@benchmark(7, 'simulate', generate_named_steps)
+def run_day7_simulation(raw_steps: List[str]) -> None:
+    day7.simulate(day7.parse_graph(raw_steps), duration=len)
+
+
+def generate_license(scale: int, rng: random.Random) -> Tuple:
+
+    def node(budget: int) -> List[int]:
+        entries = [rng.randint(1, 10) for _ in range(rng.randint(1, 3))]
+        budget -= 2 + len(entries)
+        children: List[List[int]] = []
+        if budget > 0:
+            count = rng.randint(1, 5)
+            children = [node(budget // count) for _ in range(count)]
+        tokens = [len(children), len(entries)]
+        for child in children:
+            tokens += child
+        return tokens + entries
+
+    return (node(16000 * scale),)
+
+
+@benchmark(8, 'recursive', generate_license)
+def run_day8(license: List[int]) -> None:
+    node = day8.recursive(license)
+    sum(day8.all_entries(node))
+    day8.node_value(node)
+
+
+@benchmark(8, 'evaluate', generate_license)
+def run_day8_evaluate(license: List[int]) -> None:
+    day8.evaluate(license)
+
+
+@benchmark(8, 'LicenseTree', generate_license)
+def run_day8_tree(license: List[int]) -> None:
+    tree = day8.LicenseTree(license)
+    tree.metadata_sum()
+    tree.value()
+
+
+@benchmark(9, 'play', lambda scale, rng: (427, 70723 * scale))
+def run_day9(player_count: int, last_marble: int) -> None:
+    day9.play(player_count, last_marble)
+
+
+@benchmark(9, 'play_linked', lambda scale, rng: (427, 70723 * scale))
+def run_day9_linked(player_count: int, last_marble: int) -> None:
+    day9.play_linked(player_count, last_marble)
+
+
+def generate_points(scale: int, rng: random.Random) -> Tuple:
+    seconds = 10000
+    points = []
+    for _ in range(350 * scale):
+        # Points converge into a small message after the given seconds
+        x, y = rng.randrange(60 * scale), rng.randrange(10)
+        vx, vy = rng.choice([(1, 0), (-1, 0), (0, 1), (0, -1), (2, 3), (-3, 2)])
+        points.append(day10.Point(x - vx * seconds, y - vy * seconds, vx, vy))
+    return (points,)
+
+
+@benchmark(10, 'find_message', generate_points)
+def run_day10(points: List[day10.Point]) -> None:
+    day10.find_message(points)
+
+
+def generate_pots(scale: int, rng: random.Random) -> Tuple:
+    state = ''.join(rng.choice('#.') for _ in range(100 * scale))
+    rules = {}
+    for pattern in range(32):
+        pots = ''.join('#' if pattern & (1 << i) else '.' for i in range(5))
+        rules[pots] = rng.choice('#.')
+    rules['.....'] = '.'
+    return (state, rules)
+
+
+@benchmark(12, 'iterate', generate_pots)
+def run_day12(state: str, rules: day12.Rules) -> None:
+    for generation in range(1, 21):
+        state = day12.iterate(state, rules)
+    day12.sum_pots(state, generation * 10)
+
+
+def generate_track(scale: int, rng: random.Random) -> Tuple:
+    """
+    The track consists of overlapping rectangular loops. Every loop uses its
+    own rows and columns so corners never overlap and loops only ever cross
+    each other at intersections.
+    """
+    size = side(150, scale)
+    rows = rng.sample(range(size), 12 * scale)
+    columns = rng.sample(range(size), 12 * scale)
+    track = [[' '] * size for _ in range(size)]
+
+    loops = []
+    for i in range(0, len(rows), 2):
+        top, bottom = sorted(rows[i:i + 2])
+        left, right = sorted(columns[i:i + 2])
+        loops.append((top, bottom, left, right))
+        for x in range(left + 1, right):
+            for y in (top, bottom):
+                track[y][x] = '+' if track[y][x] == '|' else '-'
+        for y in range(top + 1, bottom):
+            for x in (left, right):
+                track[y][x] = '+' if track[y][x] == '-' else '|'
+        track[top][left] = track[bottom][right] = '/'
+        track[top][right] = track[bottom][left] = '\\'
+
+    # Place a cart heading in either direction on every loop
+    for top, bottom, left, right in loops:
+        for y, direction in ((top, '>'), (bottom, '<')):
+            x = rng.randrange(left + 1, right)
+            if track[y][x] == '-':
+                track[y][x] = direction
+
+    return ([''.join(row) for row in track],)
+
+
+@benchmark(13, 'find_crashes', generate_track)
+def run_day13(track_rows: List[str]) -> None:
+    track = day13.create_track(track_rows)
+    carts = day13.create_carts(track_rows)
+    for _ in range(1000):
+        for cart in sorted(carts, key=lambda cart: cart.pos):
+            cart.update(track[cart.pos.y][cart.pos.x])
+            day13.find_crashes(carts)
+
+
+@benchmark(14, 'first_half', lambda scale, rng: (909441 * scale,))
+def run_day14(offset: int) -> None:
+    root = day14.Node(3)
+    root.next = day14.Node(7)
+    day14.first_half(root, offset, 10)
+
+
+def generate_cave(scale: int, rng: random.Random) -> Tuple:
+    size = side(32, scale)
+    cave = [['#'] * size for _ in range(size)]
+    for y in range(1, size - 1):
+        for x in range(1, size - 1):
+            # Lone pillars keep the cave connected
+            pillar = x % 2 == 0 and y % 2 == 0 and rng.random() < 0.3
+            cave[y][x] = '#' if pillar else '.'
+
+    open_squares = [(x, y) for y in range(size) for x in range(size)
+                    if cave[y][x] == '.']
+    for x, y in rng.sample(open_squares, 30 * scale):
+        cave[y][x] = rng.choice('EG')
+    return ([''.join(row) for row in cave],)
+
+
+@benchmark(15, 'battle', generate_cave)
+def run_day15(description: List[str]) -> None:
+    cave, units = day15.parse_input(description)
+    while len(set(unit.race for unit in units if unit.alive)) == 2:
+        day15.battle(units, cave)
+
+
+def generate_samples(scale: int, rng: random.Random) -> Tuple:
+    opcodes = [day16.addr, day16.addi, day16.mulr, day16.muli,
+               day16.banr, day16.bani, day16.borr, day16.bori,
+               day16.setr, day16.seti, day16.gtir, day16.gtri,
+               day16.gtrr, day16.eqir, day16.eqri, day16.eqrr]
+    samples = []
+    for _ in range(800 * scale):
+        before = [rng.randrange(4) for _ in range(4)]
+        instruction = day16.Instruction(rng.randrange(16),
+                                        *(rng.randrange(4) for _ in range(3)))
+        after = opcodes[instruction.code](instruction, before[:])
+        samples.append((before, instruction, after))
+    return (samples, opcodes)
+
+
+@benchmark(16, 'opcodes', generate_samples)
+def run_day16(samples: List[Tuple], opcodes: List[Callable]) -> None:
+    ambiguous = 0
+    for before, instruction, after in samples:
+        matching = [op for op in opcodes if op(instruction, before[:]) == after]
+        if len(matching) >= 3:
+            ambiguous += 1
+
+
+def generate_ground(scale: int, rng: random.Random) -> Tuple:
+    height, width = side(1900, scale), side(300, scale)
+    ground = [['.'] * width for _ in range(height)]
+
+    # Clay reservoirs are placed on a lattice so they never overlap
+    spring = None
+    for top in range(10, height - 20, 20):
+        for left in range(2, width - 30, 30):
+            if rng.random() < 0.4:
+                right = left + rng.randint(4, 25)
+                bottom = top + rng.randint(3, 15)
+                for y in range(top, bottom + 1):
+                    ground[y][left] = ground[y][right] = '#'
+                for x in range(left, right + 1):
+                    ground[bottom][x] = '#'
+                # The spring pours into the first reservoir
+                if spring is None:
+                    spring = (left + right) // 2
+
+    ground[0][spring] = '+'
+    return (ground,)
+
+
+@benchmark(17, 'fall', generate_ground)
+def run_day17(ground: day17.Ground) -> None:
+    day17.fall(ground[0].index('+'), 0, ground)
+
+
+def generate_acres(scale: int, rng: random.Random) -> Tuple:
+    size = side(50, scale)
+    return ([[rng.choice('.|#') for _ in range(size)] for _ in range(size)],)
+
+
+@benchmark(18, 'transform', generate_acres)
+def run_day18(acres: List[List[str]]) -> None:
+    for _ in range(10):
+        acres = day18.transform(acres)
+    day18.resource_value(acres)
+
+
+def generate_regex(scale: int, rng: random.Random) -> Tuple:
+
+    def route(budget: int) -> str:
+        parts: List[str] = []
+        while budget > 0:
+            if budget > 10 and rng.random() < 0.1:
+                options = rng.randint(2, 3)
+                branches = [route(budget // (2 * options)) for _ in range(options)]
+                # Some branches are detours which lead back to where they began
+                if rng.random() < 0.3:
+                    branches.append('')
+                part = '(' + '|'.join(branches) + ')'
+            else:
+                part = rng.choice('NESW')
+            parts.append(part)
+            budget -= len(part)
+        return ''.join(parts)
+
+    return ('^' + route(14200 * scale) + '$',)
+
+
+@benchmark(20, 'number_of_doors', generate_regex)
+def run_day20(regex: str) -> None:
+    day20.number_of_doors(day20.create_grid(regex))
+
+
+@benchmark(22, 'dijkstra', lambda scale, rng: (4845, side(6, scale), side(770, scale)))
+def run_day22(depth: int, tx: int, ty: int) -> None:
+    cave = day22.create_cave(depth, tx, ty)
+    day22.risk_level(cave, tx, ty)
+    day22.dijkstra(cave, tx, ty)
+
+
+def generate_bots(scale: int, rng: random.Random) -> Tuple:
+    lines = []
+    for _ in range(1000 * scale):
+        x, y, z = (rng.randint(-100_000_000, 100_000_000) for _ in range(3))
+        lines.append(f'pos=<{x},{y},{z}>, r={rng.randint(50_000_000, 100_000_000)}')
+    return (day23.parse_bots(lines),)
+
+
+@benchmark(23, 'best_point', generate_bots)
+def run_day23(bots: List[day23.Bot]) -> None:
+    largest = max(bots, key=lambda bot: bot.r)
+    [b for b in bots if day23.manhattan(largest.pos, b.pos) < largest.r]
+    day23.best_point(bots)
+
+
+def generate_armies(scale: int, rng: random.Random) -> Tuple:
+    attacks = ['bludgeoning', 'cold', 'fire', 'radiation', 'slashing']
+    groups = 10 * scale
+    initiatives = rng.sample(range(1, 2 * groups + 1), 2 * groups)
+
+    armies: List[List[str]] = [[], []]
+    for i, initiative in enumerate(initiatives):
+        weaknesses = ', '.join(rng.sample(attacks, rng.randint(0, 2)))
+        defense = f'(weak to {weaknesses}) ' if weaknesses else ''
+        armies[i % 2].append(
+            f'{rng.randint(100, 5000)} units each with '
+            f'{rng.randint(1000, 10000)} hit points {defense}'
+            f'with an attack that does {rng.randint(5, 100)} '
+            f'{rng.choice(attacks)} damage at initiative {initiative}')
+    return tuple(armies)
+
+
+@benchmark(24, 'battle', generate_armies)
+def run_day24(immune: List[str], infection: List[str]) -> None:
+    day24.battle(day24.parse_army(immune, 'immune'),
+                 day24.parse_army(infection, 'infection'))
+
+
+def generate_points_4d(scale: int, rng: random.Random) -> Tuple:
+    # The space grows with the amount of points to keep the density constant
+    size = int(8 * scale ** 0.25)
+    return ([day25.Point(*(rng.randint(-size, size) for _ in range(4)))
+             for _ in range(1000 * scale)],)
+
+
+@benchmark(25, 'Constellations', generate_points_4d)
+def run_day25(points: List[day25.Point]) -> None:
+    constellations = day25.Constellations(len(points))
+    for i in range(len(points) - 1):
+        for j in range(i + 1, len(points)):
+            if day25.manhattan(points[i], points[j]) <= 3:
+                constellations.union(i, j)
+    constellations.count
+
+
+def measure(bench: Benchmark, scale: int, memory: Optional[int], results) -> None:
+    """
+    Generates the input for the benchmark and times the benchmark against it.
+    Runs in a child process so it can be killed once it runs out of time.
+    """
+    if memory:
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+
+    try:
+        args = bench.generate(scale, random.Random(scale))
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            bench.run(*args)
+            elapsed = time.perf_counter() - start
+        results.put(('ok', elapsed))
+    except MemoryError:
+        results.put(('memory', None))
+    except Exception as e:
+        results.put(('error', repr(e)))
+
+
+def run_benchmark(bench: Benchmark,
+                  scale: int,
+                  timeout: Optional[float] = None,
+                  memory: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Runs a single benchmark at the given scale and returns the result
+    """
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    process = context.Process(target=measure,
+                              args=(bench, scale, memory, results))
+    process.start()
+    process.join(timeout)
+
+    if process.is_alive():
+        process.kill()
+        process.join()
+        status, value = 'timeout', None
+    elif results.empty():
+        status, value = 'crashed', None
+    else:
+        status, value = results.get()
+
+    return {
+        'day': bench.day,
+        'name': bench.name,
+        'scale': scale,
+        'status': status,
+        'time': value if status == 'ok' else None,
+        'error': value if status == 'error' else None
+    }
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmark the puzzles')
+    parser.add_argument('days', nargs='*', type=int,
+                        help='days to benchmark, defaults to all of them')
+    parser.add_argument('-s', '--scales', nargs='+', type=int,
+                        default=DEFAULT_SCALES,
+                        help='input sizes relative to the shipped inputs')
+    parser.add_argument('-t', '--timeout', type=float, default=600,
+                        help='seconds a single benchmark may take')
+    parser.add_argument('-m', '--memory', type=int, default=4096,
+                        help='megabytes of memory a single benchmark may use')
+    parser.add_argument('-o', '--output', help='path to a JSON report')
+    args = parser.parse_args()
+
+    results = []
+    for bench in BENCHMARKS:
+        if args.days and bench.day not in args.days:
+            continue
+        for scale in args.scales:
+            result = run_benchmark(bench, scale, args.timeout,
+                                   args.memory * 2 ** 20)
+            results.append(result)
+            timing = f"{result['time']:10.3f}s" if result['time'] is not None \
+                else f"{result['status']:>11}"
+            print(f"day{bench.day:<3} {bench.name:<28} {scale:>4}x {timing}")
+            sys.stdout.flush()
+
+            # Larger inputs will not fare any better so skip them
+            if result['status'] != 'ok':
+                break
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
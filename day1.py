@@ -1,5 +1,8 @@
 import os
-from typing import List, Generator, Set
+
+from collections import defaultdict
+from itertools import accumulate
+from typing import List, Dict, BinaryIO, Generator, Iterable, Optional, Tuple
 
 
 def apply_frequencies(frequencies: List[int], start: int = 0) -> Generator[int, None, None]:
@@ -13,6 +16,95 @@ def apply_frequencies(frequencies: List[int], start: int = 0) -> Generator[int,
         yield total
 
 
+def read_blocks(f: BinaryIO, block_size: int = 2 ** 20) -> Generator[List[int], None, None]:
+    """
+    Reads frequencies from a binary file like sys.stdin.buffer in blocks of
+    a fixed amount of bytes and yields the frequencies of each block, so
+    memory usage does not depend on the size of the file. A line split
+    between two blocks is carried over to the next block.
+    """
+    remainder = b''
+    while True:
+        block = f.read(block_size)
+        if not block:
+            break
+        complete, _, remainder = (remainder + block).rpartition(b'\n')
+        yield list(map(int, complete.split()))
+    if remainder.strip():
+        yield [int(remainder)]
+
+
+def accumulate_blocks(blocks: Iterable[List[int]],
+                      start: int = 0) -> Generator[List[int], None, None]:
+    """
+    Applies blocks of frequencies to the starting frequency and yields the
+    frequencies reached within each block. Equivalent to apply_frequencies
+    but accumulates a whole block at a time.
+    """
+    total = start
+    for block in blocks:
+        reached = list(accumulate(block, initial=total))[1:]
+        if reached:
+            total = reached[-1]
+        yield reached
+
+
+def sum_frequencies(blocks: Iterable[List[int]], start: int = 0) -> int:
+    """
+    Returns the frequency after applying every block of frequencies
+    """
+    return start + sum(sum(block) for block in blocks)
+
+
+def first_repeated_frequency(frequencies: List[int], start: int = 0) -> Optional[int]:
+    """
+    Returns the first frequency reached twice when the frequencies are
+    applied over and over again, or None if no frequency is ever repeated.
+    The starting frequency itself does not count as reached.
+
+    Instead of repeating the passes, the answer is computed from the
+    frequencies p reached during the first pass. Pass m reaches p + m * drift,
+    where the drift is the change in frequency over a single pass, so p is
+    reached again only by the frequencies q below it with the same residue
+    modulo the drift. For each frequency the nearest such q is found by
+    sorting the frequencies within their residue groups and the one reached
+    earliest in time wins.
+    """
+    if not frequencies:
+        return None
+
+    reached = list(accumulate(frequencies, initial=start))[1:]
+    drift = reached[-1] - start
+
+    # A frequency reached twice during the first pass is always the answer
+    seen = set()
+    for frequency in reached:
+        if frequency in seen:
+            return frequency
+        seen.add(frequency)
+
+    if drift == 0:
+        return reached[0]
+
+    # Mirror a negative drift so that later passes reach higher frequencies
+    sign = 1 if drift > 0 else -1
+    drift *= sign
+    groups: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+    for index, frequency in enumerate(reached):
+        groups[frequency * sign % drift].append((frequency * sign, index))
+
+    first: Optional[Tuple[int, int]] = None  # (time, frequency)
+    for group in groups.values():
+        group.sort()
+        for (lower, index), (higher, _) in zip(group, group[1:]):
+            passes = (higher - lower) // drift
+            time = passes * len(reached) + index
+            if first is None or time < first[0]:
+                first = (time, higher * sign)
+
+    return first[1] if first else None
+
+
 if __name__ == '__main__':
 
     with open(os.path.join('inputs', 'day1.in')) as f:
@@ -25,17 +117,18 @@ if __name__ == '__main__':
 
     assert final_frequency == 479
 
-    current_frequency = 0
-    previous_frequencies: Set[int] = set()
-    duplicate_frequency = None
+    # Stream the frequencies in small blocks to exercise lines split in two
+    with open(os.path.join('inputs', 'day1.in'), 'rb') as f:
+        reached = [frequency for block in accumulate_blocks(read_blocks(f, 64))
+                   for frequency in block]
+    assert reached == list(apply_frequencies(data))
+
+    with open(os.path.join('inputs', 'day1.in'), 'rb') as f:
+        assert sum_frequencies(read_blocks(f)) == 479
 
     # Find the first duplicate frequency
-    while duplicate_frequency is None:
-        for frequency in apply_frequencies(data, current_frequency):
-            current_frequency = frequency
-            if current_frequency in previous_frequencies:
-                duplicate_frequency = current_frequency
-                break
-            previous_frequencies.add(current_frequency)
-
-    assert duplicate_frequency == 66105
+    assert first_repeated_frequency(data) == 66105
+    assert first_repeated_frequency([+3, +3, +4, -2, -4]) == 10
+    assert first_repeated_frequency([-6, +3, +8, +5, -6]) == 5
+    assert first_repeated_frequency([+7, +7, -2, -7, -4]) == 14
+    assert first_repeated_frequency([+1, +2]) is None
@@ -3,88 +3,10 @@ import os
 from collections import namedtuple
 from typing import List, Callable, Set
 
-Registers = List[int]
-Instruction = namedtuple('Instruction', 'code, a, b, c')
-
-
-def addr(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] + registers[op.b]
-    return registers
-
-
-def addi(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] + op.b
-    return registers
-
-
-def mulr(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] * registers[op.b]
-    return registers
-
-
-def muli(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] * op.b
-    return registers
-
-
-def banr(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] & registers[op.b]
-    return registers
-
-
-def bani(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] & op.b
-    return registers
-
-
-def borr(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] | registers[op.b]
-    return registers
-
-
-def bori(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] | op.b
-    return registers
+from elfcode import (Registers, addr, addi, mulr, muli, banr, bani, borr, bori,
+                     setr, seti, gtir, gtri, gtrr, eqir, eqri, eqrr)
 
-
-def setr(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a]
-    return registers
-
-
-def seti(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = op.a
-    return registers
-
-
-def gtir(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = int(op.a > registers[op.b])
-    return registers
-
-
-def gtri(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = int(registers[op.a] > op.b)
-    return registers
-
-
-def gtrr(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = int(registers[op.a] > registers[op.b])
-    return registers
-
-
-def eqir(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = int(op.a == registers[op.b])
-    return registers
-
-
-def eqri(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = int(registers[op.a] == op.b)
-    return registers
-
-
-def eqrr(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = int(registers[op.a] == registers[op.b])
-    return registers
+Instruction = namedtuple('Instruction', 'code, a, b, c')
 
 
 if __name__ == '__main__':
@@ -1,6 +1,13 @@
 import os
-from typing import Tuple, List
-from collections import Counter
+import mmap
+
+from typing import Tuple, List, Dict, Optional
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+# Translation tables which map a count of exactly two or three to 1
+TWICE = bytes(1 if count == 2 else 0 for count in range(256))
+THRICE = bytes(1 if count == 3 else 0 for count in range(256))
 
 
 def generate_checksum_components(box: str) -> Tuple[int, int]:
@@ -26,6 +33,87 @@ def generate_checksum_components(box: str) -> Tuple[int, int]:
     return (twice, thrice)
 
 
+def count_checksum_components(buffer: bytes) -> Tuple[int, int]:
+    """
+    Counts how many of the box names in the buffer contain a character twice
+    and how many contain a character thrice. The names have to be of the same
+    length and each of them has to be followed by a newline.
+
+    Instead of counting the characters of each name separately, the buffer
+    is split into columns so that every name has a single byte in each column.
+    For every character, each column is translated into a byte per name which
+    tells whether the name has the character in that column. The columns are
+    summed by treating them as big integers, which gives the amount of the
+    character in each name as a byte. This way every step processes the whole
+    buffer at once at the speed of bytes.translate and integer addition.
+    """
+    width = buffer.find(b'\n') + 1
+    if not width:
+        return (0, 0)
+    rows = len(buffer) // width
+    if len(buffer) % width or buffer[width - 1::width] != b'\n' * rows:
+        raise ValueError('Box names are not of the same length')
+    if width > 256:
+        raise ValueError('Box names are too long to be counted in bytes')
+
+    columns = [buffer[column::width] for column in range(width - 1)]
+    twice = 0
+    thrice = 0
+    for character in set(buffer) - set(b'\n'):
+        table = bytes(1 if byte == character else 0 for byte in range(256))
+        counts = sum(int.from_bytes(column.translate(table), 'little') for column in columns)
+        counts_per_row = counts.to_bytes(rows, 'little')
+        twice |= int.from_bytes(counts_per_row.translate(TWICE), 'little')
+        thrice |= int.from_bytes(counts_per_row.translate(THRICE), 'little')
+
+    return (twice.to_bytes(rows, 'little').count(1),
+            thrice.to_bytes(rows, 'little').count(1))
+
+
+def count_checksum_components_in_chunk(path: str, offset: int, length: int) -> Tuple[int, int]:
+    """
+    Counts the checksum components of a chunk of a file of box names
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        chunk = buffer[offset:offset + length]
+    # The last name in the file might not be followed by a newline
+    if not chunk.endswith(b'\n'):
+        chunk += b'\n'
+    return count_checksum_components(chunk)
+
+
+def generate_checksum(path: str,
+                      chunk_size: int = 2 ** 26,
+                      workers: Optional[int] = None) -> int:
+    """
+    Generates the checksum for a file of box names of the same length. The
+    file is split into chunks of whole names which are counted across a
+    process pool, so files larger than the memory can be processed as well.
+    """
+    size = os.path.getsize(path)
+    if not size:
+        return 0
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        width = buffer.find(b'\n') + 1 or size + 1
+
+    chunk_size = max(width, chunk_size - chunk_size % width)
+    offsets = range(0, size, chunk_size)
+    if len(offsets) == 1:
+        twice, thrice = count_checksum_components_in_chunk(path, 0, size)
+        return twice * thrice
+
+    total_twice = 0
+    total_thrice = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        components = executor.map(count_checksum_components_in_chunk,
+                                  [path] * len(offsets), offsets,
+                                  [chunk_size] * len(offsets))
+        for twice, thrice in components:
+            total_twice += twice
+            total_thrice += thrice
+    return total_twice * total_thrice
+
+
 def find_common_name_for_boxes(boxes: List[str]) -> str:
     """
     A brute-force solution for finding two boxes where the difference in box
@@ -48,6 +136,57 @@ def find_common_name_for_boxes(boxes: List[str]) -> str:
     return ''
 
 
+def find_similar_boxes(boxes: List[str]) -> List[Tuple[int, int]]:
+    """
+    Returns the indices (i, j), i < j, of every pair of boxes whose names
+    differ by exactly one character at the same position, in sorted order.
+
+    Instead of comparing every pair of box names, the names are indexed once
+    per position with the character at that position masked out. Names which
+    differ only at the masked position end up with the same key. Building a
+    key copies the name, so finding the pairs takes O(n * L^2) expected time
+    for n names of length L, but the copying is cheap next to comparing every
+    pair for any realistic L. Only one position is indexed at a time to keep
+    memory usage at O(n * L).
+    """
+    # Identical names never differ, so each distinct name is indexed only once
+    names: Dict[str, List[int]] = defaultdict(list)
+    for index, box in enumerate(boxes):
+        names[box].append(index)
+
+    lengths: Dict[int, List[str]] = defaultdict(list)
+    for name in names:
+        lengths[len(name)].append(name)
+
+    pairs = []
+    for length, group in lengths.items():
+        for position in range(length):
+            masked: Dict[str, List[str]] = defaultdict(list)
+            for name in group:
+                masked[name[:position] + name[position + 1:]].append(name)
+            for similar in masked.values():
+                for n, name_1 in enumerate(similar):
+                    for name_2 in similar[n + 1:]:
+                        for i in names[name_1]:
+                            for j in names[name_2]:
+                                pairs.append((min(i, j), max(i, j)))
+
+    return sorted(pairs)
+
+
+def find_common_name_for_similar_boxes(boxes: List[str]) -> str:
+    """
+    Returns the common characters in the names of the first pair of boxes
+    whose names differ by a single character just like
+    find_common_name_for_boxes but without comparing every pair of boxes
+    """
+    pairs = find_similar_boxes(boxes)
+    if not pairs:
+        return ''
+    i, j = pairs[0]
+    return ''.join(a for a, b in zip(boxes[i], boxes[j]) if a == b)
+
+
 if __name__ == '__main__':
 
     with open(os.path.join('inputs', 'day2.in')) as f:
@@ -62,6 +201,17 @@ if __name__ == '__main__':
         total_thrice += thrice
     assert total_twice * total_thrice == 4920
 
+    # Count the checksum components for all the boxes at once
+    with open(os.path.join('inputs', 'day2.in'), 'rb') as f:
+        assert count_checksum_components(f.read()) == (total_twice, total_thrice)
+    assert generate_checksum(os.path.join('inputs', 'day2.in')) == 4920
+    assert generate_checksum(os.path.join('inputs', 'day2.in'), chunk_size=1024) == 4920
+
     # Find the prototype box for the second half of the puzzle
     common_name = find_common_name_for_boxes(boxes)
     assert common_name == 'fonbwmjquwtapeyzikghtvdxl'
+    assert find_common_name_for_similar_boxes(boxes) == common_name
+
+    example = ['abcde', 'fghij', 'klmno', 'pqrst', 'fguij', 'axcye', 'wvxyz']
+    assert find_similar_boxes(example) == [(1, 4)]
+    assert find_common_name_for_similar_boxes(example) == 'fgij'
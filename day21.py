@@ -1,90 +1,157 @@
 import os
 
-from collections import namedtuple, deque
-from typing import List
-
-Registers = List[int]
-Instruction = namedtuple('Instruction', 'a, b, c')
-
-
-def addr(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] + registers[op.b]
-    return registers
-
-
-def addi(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] + op.b
-    return registers
-
-
-def mulr(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] * registers[op.b]
-    return registers
-
-
-def muli(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] * op.b
-    return registers
-
-
-def banr(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] & registers[op.b]
-    return registers
-
-
-def bani(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] & op.b
-    return registers
-
-
-def borr(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] | registers[op.b]
-    return registers
-
-
-def bori(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a] | op.b
-    return registers
-
-
-def setr(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = registers[op.a]
-    return registers
-
-
-def seti(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = op.a
-    return registers
-
-
-def gtir(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = int(op.a > registers[op.b])
-    return registers
-
-
-def gtri(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = int(registers[op.a] > op.b)
-    return registers
-
+from collections import namedtuple
+from typing import Callable, Optional, Tuple
+
+from elfcode import (DIVISION, Checkpoint, Machine, Pattern, Program, match,
+                     parse_program)
+
+Step = Callable[[int], int]
+Cycle = namedtuple('Cycle', 'start, length, last')
+
+"""
+The hash the program computes between two register comparisons. The hashed
+value x is reset to the seed and every byte of x | #bit is mixed into it
+starting from the lowest one. The byte loop ends when y < #base and jumps to
+the comparison, otherwise y is divided by #base with the DIVISION loop, which
+leaves the quotient in t, and the loop starts over from the byte mixing.
+"""
+HASH: Pattern = [
+    ('bori', 'x', '#bit', 'y'),
+    ('seti', '#seed', None, 'x'),
+    ('bani', 'y', '#byte', 't'),
+    ('addr', 'x', 't', 'x'),
+    ('bani', 'x', '#mask', 'x'),
+    ('muli', 'x', '#multiplier', 'x'),
+    ('bani', 'x', '#mask', 'x'),
+    ('gtir', '#base', 'y', 't'),
+    ('addr', 't', 'ip', 'ip'),
+    ('addi', 'ip', 1, 'ip'),
+    ('seti', '#exit', None, 'ip'),
+    ('seti', 0, None, 't')
+]
+
+
+def find_cycle(step: Step, start: int, checkpoint: Optional[Checkpoint] = None) -> Cycle:
+    """
+    Finds the cycle in the sequence start, step(start), step(step(start)), ...
+    using Brent's algorithm in constant memory. Returns the index of the first
+    value in the cycle, the length of the cycle and the last value before the
+    sequence starts repeating itself.
 
-def gtrr(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = int(registers[op.a] > registers[op.b])
-    return registers
+    If a checkpoint is given, the search is resumed from the last snapshot of
+    the same search and the state of the search is saved whenever it is due.
+    """
+    state = checkpoint.load() if checkpoint else None
+    if state is None or state['start'] != start:
+        state = {'start': start, 'power': 1, 'length': 1, 'tortoise': start,
+                 'hare': step(start), 'index': None, 'previous': None}
+    power, length, tortoise, hare, index, previous = (state[name] for name in (
+        'power', 'length', 'tortoise', 'hare', 'index', 'previous'))
+
+    def save() -> None:
+        if checkpoint and checkpoint.due():
+            checkpoint.save({'start': start, 'power': power, 'length': length,
+                             'tortoise': tortoise, 'hare': hare,
+                             'index': index, 'previous': previous})
+
+    # Find the length of the cycle by teleporting the tortoise to the hare
+    if index is None:
+        while tortoise != hare:
+            if power == length:
+                tortoise = hare
+                power *= 2
+                length = 0
+            hare = step(hare)
+            length += 1
+            save()
+        tortoise = hare = start
+        index = -length
+
+    # Give the hare a head start of one cycle and walk until they meet
+    while index < 0 or tortoise != hare:
+        if index >= 0:
+            tortoise = step(tortoise)
+        previous, hare = hare, step(hare)
+        index += 1
+        save()
+
+    return Cycle(index, length, previous)
+
+
+def machine_step(program: Program, comparison: int) -> Tuple[int, Step]:
+    """
+    Returns the first value compared at the comparison and a function which
+    executes the program from the comparison to the next one with the given
+    value in the compared register, i.e. the next value the program compares.
+    """
+    _, a, b, _ = program.instructions[comparison]
+    compared, other = (a, b) if b == 0 else (b, a)
 
+    machine = Machine(program, breakpoints=[comparison])
+    if machine.run():
+        raise ValueError('Program halted before the comparison')
 
-def eqir(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = int(op.a == registers[op.b])
-    return registers
+    # Nothing but the compared value carries over from one comparison to the next
+    template = list(machine.registers)
+    template[other] = -1  # Never equal to the compared value
 
+    def step(value: int) -> int:
+        machine.registers[:] = template
+        machine.registers[compared] = value
+        if machine.run():
+            raise ValueError('Program halted between comparisons')
+        return machine.registers[compared]
 
-def eqri(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = int(registers[op.a] == op.b)
-    return registers
+    return template[compared], step
 
 
-def eqrr(op: Instruction, registers: Registers) -> Registers:
-    registers[op.c] = int(registers[op.a] == registers[op.b])
-    return registers
+def extract_step(program: Program, comparison: int) -> Optional[Step]:
+    """
+    Returns the hash computed between the comparisons as a Python function
+    or None if the program does not compute the known hash
+    """
+    _, a, b, _ = program.instructions[comparison]
+    compared = a if b == 0 else b
+
+    for start in range(len(program.instructions)):
+        bindings = match(HASH, program, start)
+        if bindings is not None and bindings['x'] == compared:
+            break
+    else:
+        return None
+
+    # The byte loop has to exit to the comparison and divide y by #base
+    # without clobbering x before it starts over
+    x, y, t, ip = (bindings[name] for name in ('x', 'y', 't', 'ip'))
+    division = match(DIVISION, program, start + len(HASH))
+    end = start + len(HASH) + len(DIVISION)
+    if (bindings['#exit'] + 1 != comparison or division is None or
+            division['q'] != t or division['x'] != y or division['t'] == x or
+            division['#k'] != bindings['#base'] or
+            end + 2 > len(program.instructions)):
+        return None
+
+    # The quotient is copied back to y and the loop jumps back to the byte mixing
+    (copy, a, _, c), (jump, target, _, destination) = program.instructions[end:end + 2]
+    if (copy, a, c) != ('setr', t, y):
+        return None
+    if (jump, target + 1, destination) != ('seti', start + 2, ip):
+        return None
+
+    bit, seed, byte, mask, multiplier, base = (bindings[name] for name in (
+        '#bit', '#seed', '#byte', '#mask', '#multiplier', '#base'))
+
+    def step(value: int) -> int:
+        y = value | bit
+        x = seed
+        while True:
+            x = (((x + (y & byte)) & mask) * multiplier) & mask
+            if base > y:
+                return x
+            y //= base
+
+    return step
 
 
 if __name__ == '__main__':
@@ -92,14 +159,7 @@ if __name__ == '__main__':
     with open(os.path.join('inputs', 'day21.in')) as f:
         lines = f.read().splitlines()
 
-    pc = int(lines[0][-1])  # Which register the program counter is stored in
-
-    # Parse instructions
-    instructions = []
-    for line in lines[1:]:
-        op, *values = line.split()
-        # This ain't production, eval is just fine and dandy
-        instructions.append((eval(op), Instruction(*[int(v) for v in values])))
+    program = parse_program(lines)
 
     """
     The solution to the first half of the puzzle can be found by evaluating the
@@ -115,43 +175,19 @@ if __name__ == '__main__':
     the register comparison sequence will eventually start from the beginning.
     Therefore the solution is to find the the _last_ value for register 4
     before the register comparison sequence starts from the beginning again.
-    """
-
-    registers = [0, 0, 0, 0, 0, 0]
-    used_register_values = set()  # All register 4 values used in eqrr
-    first_halt = None  # Register 0 value which halts first
-    last_halt = None  # Register 0 value which halts last
-    register_states = deque([], maxlen=2)  # Last 2 register values
-
-    # Execute the program and find the register values which cause a halt
-    while True:
-
-        op, instruction = instructions[registers[pc]]
-        op(instruction, registers)
-
-        if op == eqrr:
 
-            register_states.append(registers[4])
-
-            """
-            No register comparison has been executed so far so the current
-            register 4 value is what will cause the program to halt after
-            the fewest instructions
-            """
-            if not first_halt:
-                first_halt = registers[4]
-
-            """
-            Register comparison has cycled so the register value used in
-            the comparison previously is the value which causes the program
-            to halt after the most instructions
-            """
-            if registers[4] in used_register_values:
-                last_halt = register_states[0]
-                break
-
-            used_register_values.add(registers[4])
-        registers[pc] += 1
+    Each compared value only depends on the previous one, so the values form a
+    sequence which can be searched for a cycle without remembering the values
+    seen so far. The program can either be executed from one comparison to the
+    next or, much faster, the hash it computes can be evaluated directly.
+    """
+    comparison = program.instructions.index(('eqrr', 4, 0, 5))
+    first_halt, step = machine_step(program, comparison)
+    cycle = find_cycle(step, first_halt)
 
     assert first_halt == 16128384
-    assert last_halt == 7705368
+    assert cycle.last == 7705368
+
+    fast_step = extract_step(program, comparison)
+    assert fast_step is not None
+    assert find_cycle(fast_step, first_halt) == cycle
@@ -1,11 +1,15 @@
 import re
 import os
 
+from array import array
+from operator import add
+from itertools import accumulate
 from collections import namedtuple
-from typing import Any, Tuple, List, Set
+from typing import Any, Tuple, List, Set, Dict
 
 
 Claim = namedtuple('Claim', 'id, area')
+Rectangle = namedtuple('Rectangle', 'id, x1, y1, x2, y2')
 Coordinate = Tuple[int, int]
 
 
@@ -60,6 +64,171 @@ def intersect_claims(claims: List[Claim]) -> Tuple[Set[Coordinate], Set[str]]:
     return intersections, not_intersected
 
 
+def parse_rectangle(claim: str) -> Rectangle:
+    """
+    Parses claim and returns it as a Rectangle which spans the spots from
+    (x1, y1) up to but not including (x2, y2)
+    """
+    regex = r'#(\d+) @ (\d+),(\d+): (\d+)x(\d+)'
+    id_, x, y, width, height = map(int, re.match(regex, claim).groups())
+    return Rectangle(id_, x, y, x + width, y + height)
+
+
+def overlap_rectangles(rectangles: List[Rectangle]) -> Tuple[int, Set[int]]:
+    """
+    Returns the amount of spots which overlap between two or more claims and
+    the set of claims which do not overlap at all, i.e. the same results as
+    intersect_claims but as the size of the overlapping area.
+
+    Instead of generating the spots of each claim, the corners of the claims
+    are marked in a 2D difference array. Summing the difference array gives
+    the amount of claims covering each spot, and summing the overlapping spots
+    in turn gives the amount of overlapping spots within any rectangle in
+    constant time. A claim does not overlap if that amount is zero.
+    """
+    if not rectangles:
+        return 0, set()
+
+    width = max(rectangle.x2 for rectangle in rectangles)
+    height = max(rectangle.y2 for rectangle in rectangles)
+
+    difference = [[0] * (width + 1) for _ in range(height + 1)]
+    for _, x1, y1, x2, y2 in rectangles:
+        difference[y1][x1] += 1
+        difference[y1][x2] -= 1
+        difference[y2][x1] -= 1
+        difference[y2][x2] += 1
+
+    # overlapping[y][x] is the amount of overlapping spots above and left of (x, y)
+    overlapping = [array('q', [0] * (width + 1))]
+    coverage = [0] * (width + 1)
+    for row in difference[:height]:
+        coverage = list(map(add, coverage, accumulate(row)))
+        overlaps = accumulate((claims > 1 for claims in coverage[:width]), initial=0)
+        overlapping.append(array('q', map(add, overlapping[-1], overlaps)))
+
+    not_overlapping = set()
+    for id_, x1, y1, x2, y2 in rectangles:
+        overlaps = (overlapping[y2][x2] - overlapping[y1][x2] -
+                    overlapping[y2][x1] + overlapping[y1][x1])
+        if not overlaps:
+            not_overlapping.add(id_)
+
+    return overlapping[height][width], not_overlapping
+
+
+class CoverageTree:
+    """
+    Segment tree over the gaps between sorted y coordinates which keeps track
+    of how many claims cover each gap. A claim only increments the counters of
+    the nodes which its y range covers fully, so updates take O(log n) time.
+    Every node also remembers the latest insertion which covered it in order
+    to find out whether a range has been overlapped.
+    """
+    def __init__(self, ys: List[int]) -> None:
+        self._ys = ys
+        size = 4 * max(1, len(ys) - 1)
+        self._cover = [0] * size  # Claims which cover the node fully
+        self._covered = [0] * size  # Length covered by at least one claim
+        self._overlapped = [0] * size  # Length covered by at least two claims
+        self._deepest = [0] * size  # Most claims covering a gap in the node
+        self._stamp = [0] * size  # Latest insertion which covered the node
+        self._latest = [0] * size  # Latest insertion in the node or below it
+
+    @property
+    def overlapped(self) -> int:
+        """Returns the length covered by at least two claims"""
+        return self._overlapped[1]
+
+    def update(self, a: int, b: int, delta: int, stamp: int = 0) -> Tuple[int, int]:
+        """
+        Adds delta claims to the gaps from a up to b. Returns the most claims
+        which covered any of those gaps and the latest insertion which
+        overlapped any of them before the update.
+        """
+        return self._update(1, 0, len(self._ys) - 1, a, b, delta, stamp)
+
+    def _update(self, node: int, lo: int, hi: int,
+                a: int, b: int, delta: int, stamp: int) -> Tuple[int, int]:
+        if b <= lo or hi <= a:
+            return 0, 0
+        if a <= lo and hi <= b:
+            previous = self._deepest[node], self._latest[node]
+            self._cover[node] += delta
+            self._stamp[node] = max(self._stamp[node], stamp)
+        else:
+            mid = (lo + hi) // 2
+            left_deepest, left_latest = self._update(2 * node, lo, mid, a, b, delta, stamp)
+            right_deepest, right_latest = self._update(2 * node + 1, mid, hi, a, b, delta, stamp)
+            previous = (self._cover[node] + max(left_deepest, right_deepest),
+                        max(self._stamp[node], left_latest, right_latest))
+        self._pull(node, lo, hi)
+        return previous
+
+    def _pull(self, node: int, lo: int, hi: int) -> None:
+        if hi - lo == 1:
+            covered = overlapped = deepest = latest = 0
+        else:
+            left, right = 2 * node, 2 * node + 1
+            covered = self._covered[left] + self._covered[right]
+            overlapped = self._overlapped[left] + self._overlapped[right]
+            deepest = max(self._deepest[left], self._deepest[right])
+            latest = max(self._latest[left], self._latest[right])
+
+        cover = self._cover[node]
+        length = self._ys[hi] - self._ys[lo]
+        self._covered[node] = length if cover else covered
+        self._overlapped[node] = length if cover > 1 else covered if cover else overlapped
+        self._deepest[node] = cover + deepest
+        self._latest[node] = max(self._stamp[node], latest)
+
+
+def sweep_rectangles(rectangles: List[Rectangle]) -> Tuple[int, Set[int]]:
+    """
+    Returns the same results as overlap_rectangles but sweeps a line over the
+    x coordinates of the claims instead of filling a grid, so it takes
+    O(n log n) time and O(n) memory no matter how large the coordinates are.
+
+    The overlapping area is the length of the sweep line covered by at least
+    two claims times the distance to the next x coordinate. A claim overlaps
+    another one if either one of them starts while the other one is on the
+    sweep line within the same y range. When a claim starts, the tree tells
+    whether its y range was already covered, and when it ends, whether a
+    claim has started within its y range after it.
+    """
+    claims = [rectangle for rectangle in rectangles
+              if rectangle.x1 < rectangle.x2 and rectangle.y1 < rectangle.y2]
+    ys = sorted(set(y for claim in claims for y in (claim.y1, claim.y2)))
+    index = {y: i for i, y in enumerate(ys)}
+
+    # Claims end before other claims start at the same x since they only touch
+    events = sorted([(claim.x1, 1, i) for i, claim in enumerate(claims)] +
+                    [(claim.x2, 0, i) for i, claim in enumerate(claims)])
+
+    tree = CoverageTree(ys)
+    stamps: Dict[int, int] = {}
+    overlapping = set()
+    area = 0
+    previous_x = 0
+    for stamp, (x, starts, i) in enumerate(events, 1):
+        area += tree.overlapped * (x - previous_x)
+        previous_x = x
+
+        a, b = index[claims[i].y1], index[claims[i].y2]
+        if starts:
+            stamps[i] = stamp
+            deepest, _ = tree.update(a, b, 1, stamp)
+            if deepest:
+                overlapping.add(i)
+        else:
+            _, latest = tree.update(a, b, -1)
+            if latest > stamps.pop(i):
+                overlapping.add(i)
+
+    overlapping_ids = set(claims[i].id for i in overlapping)
+    return area, set(rectangle.id for rectangle in rectangles) - overlapping_ids
+
+
 if __name__ == '__main__':
 
     simple_data = [
@@ -71,8 +240,14 @@ if __name__ == '__main__':
     intersections, not_intersected = intersect_claims(claims)
     assert len(intersections) == 4
     assert not_intersected == {3}
+    rectangles = [parse_rectangle(claim) for claim in simple_data]
+    assert overlap_rectangles(rectangles) == (4, {3})
+    assert sweep_rectangles(rectangles) == (4, {3})
 
     claims = [parse_claim(claim) for claim in read_claims('day3.in')]
     intersections, not_intersected = intersect_claims(claims)
     assert len(intersections) == 111630
     assert not_intersected == {724}
+    rectangles = [parse_rectangle(claim) for claim in read_claims('day3.in')]
+    assert overlap_rectangles(rectangles) == (111630, {724})
+    assert sweep_rectangles(rectangles) == (111630, {724})
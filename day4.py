@@ -1,11 +1,16 @@
 import re
 import os
+import heapq
+import tempfile
+from array import array
+from itertools import islice
 from datetime import datetime, timedelta
 from collections import namedtuple, defaultdict, Counter
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterable, Iterator, Optional
 
 
 Record = namedtuple('Record', 'time, event')
+Histograms = Dict[int, array]
 
 
 def parse_records(raw_records: List[str]) -> List[Record]:
@@ -23,10 +28,22 @@ def parse_records(raw_records: List[str]) -> List[Record]:
     return records
 
 
+def most_slept_minute(minutes: List[int]) -> Tuple[int, int]:
+    """
+    Returns the minute slept on most often and how many times it was slept
+    on, preferring the lowest minute on ties
+    """
+    counts = Counter(minutes)
+    minute = min(counts, key=lambda minute: (-counts[minute], minute))
+    return (minute, counts[minute])
+
+
 def sleepiest_guard(records: List[Record], strategy: int) -> Tuple[int, int]:
     """
     Finds the sleepiest guard according to either the first or second strategy
-    and returns the guard identifier and the minute they slept most on.
+    and returns the guard identifier and the minute they slept most on. Ties
+    are broken in favour of the guard who fell asleep first in the records
+    and the lowest minute.
     """
     # Map from guard to how long they slept in total
     total_slept: Dict[int, timedelta] = defaultdict(timedelta)
@@ -48,7 +65,7 @@ def sleepiest_guard(records: List[Record], strategy: int) -> Tuple[int, int]:
     # Find the guard who slept the most and their most slept minute
     if strategy == 1:
         worst_guard, _ = max(total_slept.items(), key=lambda slept: slept[1])
-        laziest_minute, _ = Counter(minutes_slept[worst_guard]).most_common(1)[0]
+        laziest_minute, _ = most_slept_minute(minutes_slept[worst_guard])
         return (worst_guard, laziest_minute)
     # Find the guard who slept most during a single minute
     else:
@@ -56,14 +73,92 @@ def sleepiest_guard(records: List[Record], strategy: int) -> Tuple[int, int]:
         most_slept = 0
         worst_guard = -1
         for guard, minutes in minutes_slept.items():
-            most_slept_minute, count = Counter(minutes).most_common(1)[0]
+            minute, count = most_slept_minute(minutes)
             if count > most_slept:
                 worst_guard = guard
-                laziest_minute = most_slept_minute
+                laziest_minute = minute
                 most_slept = count
         return (worst_guard, laziest_minute)
 
 
+def timestamp(raw_record: str) -> str:
+    """
+    Returns the timestamp of a string record. The timestamps are of fixed
+    width so they sort in chronological order as strings.
+    """
+    return raw_record[1:17]
+
+
+def sort_externally(raw_records: Iterable[str],
+                    run_size: int = 10 ** 6,
+                    directory: Optional[str] = None) -> Iterator[str]:
+    """
+    Sorts string records chronologically without holding more than run_size
+    records in memory at once. The records are sorted in runs which are
+    written to temporary files in the directory, and the runs are then merged
+    lazily while the sorted records are consumed.
+    """
+    records = iter(raw_records)
+    with tempfile.TemporaryDirectory(dir=directory) as temporary:
+        runs = []
+        while True:
+            run = sorted((record.rstrip('\n') for record in islice(records, run_size)),
+                         key=timestamp)
+            if not run:
+                break
+            path = os.path.join(temporary, f'{len(runs)}.run')
+            with open(path, 'w') as f:
+                f.writelines(record + '\n' for record in run)
+            runs.append(path)
+
+        files = [open(path) for path in runs]
+        try:
+            merged = heapq.merge(*files, key=timestamp)
+            yield from (record.rstrip('\n') for record in merged)
+        finally:
+            for f in files:
+                f.close()
+
+
+def sleep_histograms(raw_records: Iterable[str]) -> Histograms:
+    """
+    Counts how many times each guard slept on each minute from string records
+    in chronological order. Instead of parsing the records with a regex and
+    datetime, the fields are sliced from their fixed offsets, e.g. the minute
+    of '[1518-11-01 00:05] falls asleep' is always at offset 15. The records
+    are consumed one at a time, so they can be streamed from sort_externally.
+    """
+    histograms: Histograms = {}
+    for record in raw_records:
+        event = record[19]
+        if event == 'G':
+            guard = int(record[26:].split(' ', 1)[0])
+        elif event == 'f':
+            start = int(record[15:17])
+        else:
+            if guard not in histograms:
+                histograms[guard] = array('i', [0] * 60)
+            histogram = histograms[guard]
+            for minute in range(start, int(record[15:17])):
+                histogram[minute] += 1
+    return histograms
+
+
+def sleepiest_guard_in_histograms(histograms: Histograms, strategy: int) -> Tuple[int, int]:
+    """
+    Finds the sleepiest guard according to either the first or second strategy
+    like sleepiest_guard but from the minute histograms of the guards. Ties
+    are broken the same way as long as the histograms are in the order the
+    guards first fell asleep, which is the order sleep_histograms adds them.
+    """
+    if strategy == 1:
+        worst_guard = max(histograms, key=lambda guard: sum(histograms[guard]))
+    else:
+        worst_guard = max(histograms, key=lambda guard: max(histograms[guard]))
+    histogram = histograms[worst_guard]
+    return (worst_guard, histogram.index(max(histogram)))
+
+
 if __name__ == '__main__':
 
     example_data = [
@@ -89,9 +184,48 @@ if __name__ == '__main__':
     assert sleepiest_guard(records, strategy=1) == (10, 24)
     assert sleepiest_guard(records, strategy=2) == (99, 45)
 
+    histograms = sleep_histograms(sorted(example_data, key=timestamp))
+    assert sleepiest_guard_in_histograms(histograms, strategy=1) == (10, 24)
+    assert sleepiest_guard_in_histograms(histograms, strategy=2) == (99, 45)
+
+    # Both guards sleep as much and neither has a single most slept minute
+    tied_data = [
+        '[1518-11-01 00:00] Guard #10 begins shift',
+        '[1518-11-01 00:40] falls asleep',
+        '[1518-11-01 00:41] wakes up',
+        '[1518-11-01 00:50] falls asleep',
+        '[1518-11-01 00:51] wakes up',
+        '[1518-11-02 00:00] Guard #10 begins shift',
+        '[1518-11-02 00:30] falls asleep',
+        '[1518-11-02 00:31] wakes up',
+        '[1518-11-03 00:00] Guard #99 begins shift',
+        '[1518-11-03 00:20] falls asleep',
+        '[1518-11-03 00:21] wakes up',
+        '[1518-11-03 00:35] falls asleep',
+        '[1518-11-03 00:36] wakes up',
+        '[1518-11-04 00:00] Guard #99 begins shift',
+        '[1518-11-04 00:05] falls asleep',
+        '[1518-11-04 00:06] wakes up'
+    ]
+    records = sorted(parse_records(tied_data), key=lambda rec: rec.time)
+    histograms = sleep_histograms(sorted(tied_data, key=timestamp))
+    for strategy in (1, 2):
+        assert sleepiest_guard(records, strategy) == (10, 30)
+        assert sleepiest_guard_in_histograms(histograms, strategy) == (10, 30)
+
     with open(os.path.join('inputs', 'day4.in')) as f:
         complex_data = f.read().splitlines()
 
     records = sorted(parse_records(complex_data), key=lambda rec: rec.time)
     assert sleepiest_guard(records, strategy=1) == (2851, 44)
     assert sleepiest_guard(records, strategy=2) == (733, 25)
+
+    histograms = sleep_histograms(sorted(complex_data, key=timestamp))
+    assert sleepiest_guard_in_histograms(histograms, strategy=1) == (2851, 44)
+    assert sleepiest_guard_in_histograms(histograms, strategy=2) == (733, 25)
+
+    # Stream the log through an external sort with runs much smaller than the log
+    with open(os.path.join('inputs', 'day4.in')) as f:
+        histograms = sleep_histograms(sort_externally(f, run_size=100))
+    assert sleepiest_guard_in_histograms(histograms, strategy=1) == (2851, 44)
+    assert sleepiest_guard_in_histograms(histograms, strategy=2) == (733, 25)
@@ -1,31 +1,81 @@
 import string
+import mmap
 import re
 import os
-from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Optional, BinaryIO
+
+
+# Units which can react, i.e. letters whose capitalization differs by 0x20
+UNITS = frozenset(string.ascii_letters.encode())
+
+
+def react(stack: bytearray, units: bytes) -> bytearray:
+    """
+    Adds the units to the end of an already reacted polymer stack and
+    triggers the reactions. Returns the stack.
+
+    The algorithm keeps the units which have not reacted so far in a stack.
+    Since a unit can only react with the unit right before it, each unit
+    either annihilates with the unit at the top of the stack or is pushed to
+    the stack, so the polymer is reacted in a single pass. Two units react if
+    they are the same letter in different case, i.e. they differ by 0x20.
+    """
+    for unit in units:
+        if stack and unit ^ stack[-1] == 0x20 and unit in UNITS:
+            stack.pop()
+        else:
+            stack.append(unit)
+    return stack
 
 
 def trigger_reactions(polymer: str) -> str:
     """
     Triggers the polymer reactions and returns the polymer with all the
     reactions applied.
+    """
+    return react(bytearray(), polymer.encode()).decode()
+
+
+def react_stream(f: BinaryIO, block_size: int = 2 ** 20) -> int:
+    """
+    Reads the polymer from a binary file or a memory map in blocks, triggers
+    the reactions and returns the length of the reacted polymer. Only the
+    units which have not reacted so far are kept in memory between blocks,
+    and whitespace like the trailing newline is ignored.
+    """
+    stack = bytearray()
+    for block in iter(lambda: f.read(block_size), b''):
+        react(stack, block.translate(None, string.whitespace.encode()))
+    return len(stack)
+
+
+def remove_and_react(polymer: bytes, unit: str) -> Tuple[str, int]:
+    """
+    Removes the unit in both cases from the polymer and returns the unit and
+    the length of the polymer after the reactions
+    """
+    removed = polymer.translate(None, (unit.lower() + unit.upper()).encode())
+    return (unit, len(react(bytearray(), removed)))
+
 
-    The algorithm works by iterating through the polymer and comparing the
-    current unit against the next unit. If the next unit is the same as
-    the current one but differ in capitalization then they are removed from
-    the string and the algorithm starts again but this time one unit earlier
-    than the current position.
+def rank_removals(polymer: str, workers: Optional[int] = None) -> List[Tuple[str, int]]:
     """
-    i = 0
-    while i < len(polymer) - 1:
-        if polymer[i].lower() == polymer[i + 1].lower():
-            if ((polymer[i].isupper() and polymer[i + 1].islower()) or
-                    (polymer[i].islower() and polymer[i + 1].isupper())):
-                    polymer = polymer[:i] + polymer[i + 2:]
-                    i -= 1
-                    continue
-        i += 1
+    Ranks the units by the length of the polymer after removing the unit and
+    triggering the reactions, shortest first. Whitespace around the polymer is
+    ignored.
 
-    return polymer
+    Removing a unit does not prevent any reactions between the other units,
+    so the units can be removed from the already reacted polymer instead of
+    the original one. The reacted polymer is much shorter, and the removals
+    are evaluated in parallel across a process pool.
+    """
+    reacted = bytes(react(bytearray(), polymer.strip().encode()))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        lengths = list(executor.map(remove_and_react,
+                                    [reacted] * len(string.ascii_lowercase),
+                                    string.ascii_lowercase))
+    return sorted(lengths, key=lambda removal: (removal[1], removal[0]))
 
 
 if __name__ == '__main__':
@@ -43,3 +93,13 @@ if __name__ == '__main__':
         polymer = re.sub(f'[{char}{char.upper()}]', '', complex_polymer)
         polymers.append((char, len(trigger_reactions(polymer)) - 1))
     assert min(polymers, key=lambda x: x[1]) == ('g', 4282)
+
+    ranking = rank_removals(complex_polymer)
+    assert ranking[0] == ('g', 4282)
+    assert sorted(ranking) == polymers
+
+    # Stream the polymer in blocks which split reacting units apart
+    with open(os.path.join('inputs', 'day5.in'), 'rb') as f:
+        assert react_stream(f, block_size=1001) == 11814
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as polymer_map:
+            assert react_stream(polymer_map) == 11814
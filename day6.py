@@ -1,11 +1,16 @@
 import os
 
-from collections import namedtuple, defaultdict
-from typing import List, Tuple, DefaultDict
+from array import array
+from collections import namedtuple, defaultdict, Counter
+from typing import List, Tuple, Dict, DefaultDict
 
 
 Coord = namedtuple('Coord', 'x, y')
 
+# Labels of grid cells which are not nearest to any single coordinate
+UNREACHED = -2
+SHARED = -1
+
 
 def manhattan(first: Coord, second: Coord) -> int:
     """
@@ -78,6 +83,65 @@ def largest_finite_area(coords: List[Coord]) -> int:
     return len(largest_area)
 
 
+def label_nearest(coords: List[Coord]) -> Tuple[array, int]:
+    """
+    Labels every cell of the grid from 0, 0 to max_x, max_y with the index of
+    the closest known coordinate or SHARED if multiple coordinates are the
+    closest ones. Returns the labels row by row and the width of the grid.
+
+    Since Manhattan distances on a grid are the lengths of the shortest paths
+    between cells, the labels are spread with a breadth-first search starting
+    from all the known coordinates at once. A cell is shared if the cells it
+    is reached from on the previous layer carry different labels or are
+    shared themselves. The search visits each cell once no matter how many
+    coordinates there are.
+    """
+    width = max(coord.x for coord in coords) + 1
+    height = max(coord.y for coord in coords) + 1
+    size = width * height
+
+    labels = array('i', [UNREACHED]) * size
+    frontier: Dict[int, int] = {}
+    for label, coord in enumerate(coords):
+        frontier.setdefault(coord.y * width + coord.x, label)
+
+    while frontier:
+        for cell, label in frontier.items():
+            labels[cell] = label
+
+        reached: Dict[int, int] = {}
+        for cell, label in frontier.items():
+            x = cell % width
+            for neighbour, inside in ((cell - 1, x > 0),
+                                      (cell + 1, x < width - 1),
+                                      (cell - width, cell >= width),
+                                      (cell + width, cell < size - width)):
+                if inside and labels[neighbour] == UNREACHED:
+                    if reached.setdefault(neighbour, label) != label:
+                        reached[neighbour] = SHARED
+        frontier = reached
+
+    return labels, width
+
+
+def largest_finite_area_by_labels(coords: List[Coord]) -> int:
+    """
+    Returns the size of the largest finite area formed by the coordinates like
+    largest_finite_area but counts the areas from the labelled grid. Areas
+    which reach the edge of the grid are infinite.
+    """
+    labels, width = label_nearest(coords)
+    height = len(labels) // width
+
+    edges = set(labels[:width]) | set(labels[-width:])
+    edges.update(labels[y * width] for y in range(height))
+    edges.update(labels[y * width + width - 1] for y in range(height))
+
+    areas = Counter(labels)
+    return max(size for label, size in areas.items()
+               if label >= 0 and label not in edges)
+
+
 def close_to_all(coord: Coord, coords: List[Coord], tolerance: int) -> bool:
     """
     Returns True if coordinate is within a specified distance to all known
@@ -102,6 +166,60 @@ def area_near_locations(coords: List[Coord], tolerance: int = 30) -> int:
     return len(area)
 
 
+def distance_sums(values: List[int], tolerance: int) -> List[int]:
+    """
+    Returns the sums of the distances from each integer on the axis to all the
+    values, left to right, for the integers where the sum is below tolerance.
+
+    Moving one step right adds one to the distance to each value at or left
+    of the current position and subtracts one from the distance to every
+    other value, so each sum is computed from the previous one in constant
+    time. Beyond the values each step adds len(values) to the sum, so the sums
+    can only be below tolerance within tolerance // len(values) of them.
+    """
+    values = sorted(values)
+    reach = tolerance // len(values) + 1
+    x = values[0] - reach
+    total = sum(values) - x * len(values)
+    left = 0  # Amount of values at or left of x
+
+    sums = []
+    while x <= values[-1] + reach:
+        if total < tolerance:
+            sums.append(total)
+        while left < len(values) and values[left] <= x:
+            left += 1
+        total += left - (len(values) - left)
+        x += 1
+    return sums
+
+
+def area_near_locations_by_axis(coords: List[Coord], tolerance: int = 30) -> int:
+    """
+    Returns the size of the area which contains all coordinates within a
+    specified distance to all known coordinates like area_near_locations, but
+    also counts the area beyond the known coordinates.
+
+    The sum of Manhattan distances to a coordinate is the sum of distances to
+    its x and the sum of distances to its y, so the sums are computed for each
+    axis separately. Then for each x sum, in increasing order, the y sums
+    which are small enough are counted by moving a pointer down the y sums.
+    """
+    if not coords:
+        return 0
+
+    x_sums = sorted(distance_sums([coord.x for coord in coords], tolerance))
+    y_sums = sorted(distance_sums([coord.y for coord in coords], tolerance))
+
+    area = 0
+    close = len(y_sums)  # Amount of y sums small enough for the current x sum
+    for x_sum in x_sums:
+        while close and x_sum + y_sums[close - 1] >= tolerance:
+            close -= 1
+        area += close
+    return area
+
+
 if __name__ == '__main__':
 
     simple_coords = [
@@ -113,10 +231,17 @@ if __name__ == '__main__':
         Coord(8, 9)
     ]
     assert largest_finite_area(simple_coords) == 17
+    assert largest_finite_area_by_labels(simple_coords) == 17
     assert area_near_locations(simple_coords, 32) == 16
+    assert area_near_locations_by_axis(simple_coords, 32) == 16
 
     with open(os.path.join('inputs', 'day6.in')) as f:
         coords = [Coord(*map(int, line.split(', '))) for line in f]
 
     assert largest_finite_area(coords) == 2342
+    assert largest_finite_area_by_labels(coords) == 2342
     assert area_near_locations(coords, 10000) == 43302
+    assert area_near_locations_by_axis(coords, 10000) == 43302
+
+    # The area grows beyond the known coordinates with a larger tolerance
+    assert area_near_locations_by_axis([Coord(0, 0)], 3) == 13
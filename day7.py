@@ -1,11 +1,15 @@
 import re
+import heapq
 import string
 import os
 
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Callable
 from enum import Enum
 
 
+Graph = Dict[str, List[str]]
+
+
 class State(Enum):
     """
     State of a single step
@@ -134,6 +138,114 @@ def execute_steps_in_parallel(steps: List[Step]) -> Tuple[str, int]:
     return order, time - 1
 
 
+def parse_graph(raw_steps: List[str]) -> Graph:
+    """
+    Parses steps from strings and returns a graph which maps each step name
+    to the names of the steps after it. Unlike parse_steps, the step names
+    can be any strings without whitespace.
+    """
+    regex = r'Step (\S+) must be finished before step (\S+) can begin'
+    graph: Graph = {}
+    for step in raw_steps:
+        pre, post = re.match(regex, step).groups()
+        graph.setdefault(pre, []).append(post)
+        graph.setdefault(post, [])
+    return graph
+
+
+def topological_order(graph: Graph) -> List[str]:
+    """
+    Returns the execution order for the steps in the graph just like
+    execute_steps, i.e. the alphabetically first available step is always
+    executed next.
+
+    The steps are sorted topologically by counting how many unfinished steps
+    precede each step and keeping the steps which have none left in a heap,
+    so the order is found in O((V + E) log V) time. Raises a ValueError if
+    the steps depend on each other in a cycle.
+    """
+    preceding = {step: 0 for step in graph}
+    for post_steps in graph.values():
+        for post in post_steps:
+            preceding[post] += 1
+
+    available = [step for step, count in preceding.items() if count == 0]
+    heapq.heapify(available)
+
+    order = []
+    while available:
+        step = heapq.heappop(available)
+        order.append(step)
+        for post in graph[step]:
+            preceding[post] -= 1
+            if preceding[post] == 0:
+                heapq.heappush(available, post)
+
+    if len(order) != len(graph):
+        raise ValueError('Steps depend on each other in a cycle')
+    return order
+
+
+def step_duration(name: str) -> int:
+    """
+    Returns how many seconds it takes to execute the step, i.e. 60 seconds
+    plus the position of the step name in the alphabet
+    """
+    return 61 + string.ascii_uppercase.index(name)
+
+
+def simulate(graph: Graph,
+             workers: int = 5,
+             duration: Callable[[str], float] = step_duration) -> Tuple[List[str], float]:
+    """
+    Returns the order in which the workers finish the steps in the graph and
+    the time it takes to finish all of them, like execute_steps_in_parallel.
+
+    Instead of advancing time second by second, the finish times of the steps
+    being executed are kept in a heap and time jumps straight to the next one.
+    Steps finishing at the same time finish in the order they were started,
+    and the alphabetically first available steps are started whenever workers
+    become free. The cost depends on the amount of steps rather than the time
+    it takes to execute them.
+    """
+    if workers < 1:
+        raise ValueError('At least one worker is needed')
+
+    preceding = {step: 0 for step in graph}
+    for post_steps in graph.values():
+        for post in post_steps:
+            preceding[post] += 1
+
+    available = [step for step, count in preceding.items() if count == 0]
+    heapq.heapify(available)
+
+    running: List[Tuple[float, int, str]] = []  # (finish time, start order, step)
+    started = 0
+    order: List[str] = []
+    time: float = 0
+    while True:
+        while available and len(running) < workers:
+            step = heapq.heappop(available)
+            heapq.heappush(running, (time + duration(step), started, step))
+            started += 1
+        if not running:
+            break
+
+        # Finish every step which finishes at the same time before starting more
+        time = running[0][0]
+        while running and running[0][0] == time:
+            _, _, step = heapq.heappop(running)
+            order.append(step)
+            for post in graph[step]:
+                preceding[post] -= 1
+                if preceding[post] == 0:
+                    heapq.heappush(available, post)
+
+    if len(order) != len(graph):
+        raise ValueError('Steps depend on each other in a cycle')
+    return order, time
+
+
 if __name__ == '__main__':
 
     with open(os.path.join('inputs', 'day7.in')) as f:
@@ -142,7 +254,16 @@ if __name__ == '__main__':
     # Solve first part of the puzzle
     steps = parse_steps(raw_steps)
     assert execute_steps(steps) == 'GNJOCHKSWTFMXLYDZABIREPVUQ'
+    graph = parse_graph(raw_steps)
+    assert ''.join(topological_order(graph)) == 'GNJOCHKSWTFMXLYDZABIREPVUQ'
 
     # Solve second part of the puzzle
     steps = parse_steps(raw_steps)
     assert execute_steps_in_parallel(steps) == ('GNOYCHJWKXSTFZLAMBDIREPVUQ', 886)
+    order, time = simulate(graph)
+    assert (''.join(order), time) == ('GNOYCHJWKXSTFZLAMBDIREPVUQ', 886)
+
+    # Steps taking hours cost no more to simulate than steps taking seconds
+    seconds = simulate(graph, workers=2)
+    hours = simulate(graph, workers=2, duration=lambda name: 3600 * step_duration(name))
+    assert hours == (seconds[0], seconds[1] * 3600)
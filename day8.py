@@ -1,6 +1,10 @@
+import io
 import os
+import mmap
 
-from typing import List
+from array import array
+from itertools import islice
+from typing import List, Tuple, BinaryIO, Iterable, Iterator
 from collections import namedtuple
 
 
@@ -72,6 +76,159 @@ def node_value(node: Node) -> int:
         return value
 
 
+def read_tokens(f: BinaryIO, block_size: int = 2 ** 20) -> Iterator[int]:
+    """
+    Reads license tokens from a binary file or a memory map in blocks and
+    yields them one at a time. A token split between two blocks is carried
+    over to the next block. Tokens can be separated by any whitespace.
+    """
+    remainder = b''
+    for block in iter(lambda: f.read(block_size), b''):
+        data = remainder + block
+        # Cut after the last whitespace so no token is split in two
+        cut = max(data.rfind(space) for space in b' \t\n\r\v\f') + 1
+        yield from map(int, data[:cut].split())
+        remainder = data[cut:]
+    if remainder.strip():
+        yield int(remainder)
+
+
+def evaluate(license: Iterable[int]) -> Tuple[int, int]:
+    """
+    Returns the sum of all metadata entries and the value of the root node of
+    the license without constructing a tree.
+
+    The tokens are consumed in order with a single cursor, so the license can
+    be streamed. Instead of recursing, the nodes whose children have not all
+    been read yet are kept in an explicit stack, so deeply nested licenses do
+    not overflow the call stack. When the last child of a node has been read,
+    the metadata entries of the node follow and its value can be computed
+    from the values of its children.
+    """
+    error = 'License ended before all the nodes were read'
+    tokens = iter(license)
+    total = 0
+    try:
+        # Each node on the stack is [child count, entry count, child values]
+        stack = [[next(tokens), next(tokens), []]]
+        while True:
+            child_count, meta, child_values = stack[-1]
+            if len(child_values) < child_count:
+                stack.append([next(tokens), next(tokens), []])
+                continue
+
+            stack.pop()
+            entries = list(islice(tokens, meta))
+            if len(entries) < meta:
+                raise ValueError(error)
+            total += sum(entries)
+
+            if child_count == 0:
+                value = sum(entries)
+            else:
+                value = sum(child_values[entry - 1] for entry in entries
+                            if 1 <= entry <= child_count)
+
+            if not stack:
+                return total, value
+            stack[-1][2].append(value)
+    except StopIteration:
+        raise ValueError(error) from None
+
+
+class LicenseTree:
+    """
+    Tree of license nodes stored as a structure of arrays. The nodes are
+    numbered in the order they appear in the license, so the root is node 0,
+    the first child of a node follows the node and the subtree of a node
+    spans the nodes from the node up to the node plus the size of the subtree.
+    Each node takes a handful of integers on top of the license tokens.
+    """
+    def __init__(self, license: Iterable[int]) -> None:
+        self.tokens = array('i', license)
+        self.child_counts = array('i')
+        self.entry_counts = array('i')
+        self.entry_offsets = array('i')  # Token offset of the metadata entries
+        self.sizes = array('i')  # Amount of nodes in the subtree of the node
+        self.depths = array('i')
+
+        # Each node on the stack is [node, children not read yet]
+        stack: List[List[int]] = []
+        cursor = 0
+        while True:
+            if len(self.tokens) < cursor + 2:
+                raise ValueError('License ended before all the nodes were read')
+            node = len(self.child_counts)
+            self.child_counts.append(self.tokens[cursor])
+            self.entry_counts.append(self.tokens[cursor + 1])
+            self.entry_offsets.append(0)
+            self.sizes.append(0)
+            self.depths.append(len(stack))
+            stack.append([node, self.tokens[cursor]])
+            cursor += 2
+
+            # Entries follow once all the children of a node have been read
+            while stack and stack[-1][1] == 0:
+                node, _ = stack.pop()
+                self.entry_offsets[node] = cursor
+                self.sizes[node] = len(self.child_counts) - node
+                cursor += self.entry_counts[node]
+                if stack:
+                    stack[-1][1] -= 1
+            if not stack:
+                break
+
+        if len(self.tokens) < cursor:
+            raise ValueError('License ended before all the nodes were read')
+
+    def __len__(self) -> int:
+        """Returns the amount of nodes"""
+        return len(self.child_counts)
+
+    def children(self, node: int) -> Iterator[int]:
+        """Yields the children of the node"""
+        child = node + 1
+        for _ in range(self.child_counts[node]):
+            yield child
+            child += self.sizes[child]
+
+    def entries(self, node: int) -> array:
+        """Returns the metadata entries of the node"""
+        offset = self.entry_offsets[node]
+        return self.tokens[offset:offset + self.entry_counts[node]]
+
+    def metadata_sum(self, node: int = 0) -> int:
+        """Returns the sum of the metadata entries in the subtree of the node"""
+        return sum(sum(self.entries(descendant))
+                   for descendant in range(node, node + self.sizes[node]))
+
+    def value(self, node: int = 0) -> int:
+        """
+        Computes the value of the node. The nodes in the subtree are valued in
+        reverse order so the children are always valued before their parent.
+        """
+        values = array('q', [0]) * self.sizes[node]
+        for descendant in reversed(range(node, node + self.sizes[node])):
+            entries = self.entries(descendant)
+            if not self.child_counts[descendant]:
+                values[descendant - node] = sum(entries)
+            else:
+                children = list(self.children(descendant))
+                values[descendant - node] = sum(values[children[entry - 1] - node]
+                                                for entry in entries
+                                                if 1 <= entry <= len(children))
+        return values[0]
+
+    def depth(self, node: int = 0) -> int:
+        """Returns the depth of the subtree of the node"""
+        subtree = self.depths[node:node + self.sizes[node]]
+        return max(subtree) - self.depths[node]
+
+    def subtree_size(self, node: int = 0) -> int:
+        """Returns the amount of nodes in the subtree of the node"""
+        return self.sizes[node]
+
+
 if __name__ == '__main__':
 
     simple_license = '2 3 0 3 10 11 12 1 1 0 1 99 2 1 1 2'
@@ -79,6 +236,11 @@ if __name__ == '__main__':
     node = recursive(license_tokens)
     assert sum(all_entries(node)) == 138
     assert node_value(node) == 66
+    assert evaluate(license_tokens) == (138, 66)
+    tree = LicenseTree(license_tokens)
+    assert (tree.metadata_sum(), tree.value()) == (138, 66)
+    assert list(tree.children(0)) == [1, 2]
+    assert (len(tree), tree.depth(), tree.subtree_size(2), tree.value(2)) == (4, 2, 2, 0)
 
     with open(os.path.join('inputs', 'day8.in')) as f:
         complex_license = f.read()
@@ -87,3 +249,20 @@ if __name__ == '__main__':
     node = recursive(license_tokens)
     assert sum(all_entries(node)) == 44838
     assert node_value(node) == 22198
+    assert evaluate(license_tokens) == (44838, 22198)
+    tree = LicenseTree(license_tokens)
+    assert (tree.metadata_sum(), tree.value()) == (44838, 22198)
+
+    # Stream the tokens from a memory map in blocks which split tokens apart
+    with open(os.path.join('inputs', 'day8.in'), 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as license_map:
+            assert evaluate(read_tokens(license_map, 1000)) == (44838, 22198)
+
+    # Tokens can be on separate lines and separated by runs of whitespace
+    streamed_license = io.BytesIO(b'1 1\n0  1 5\n1\n')
+    assert evaluate(read_tokens(streamed_license, 3)) == (6, 5)
+
+    # Nesting far deeper than the recursion limit is fine
+    deep_license = [1, 1] * 100000 + [0, 1, 5] + [1] * 100000
+    assert evaluate(deep_license) == (100005, 5)
+    assert LicenseTree(deep_license).depth() == 100000
@@ -1,3 +1,4 @@
+from array import array
 from collections import defaultdict
 from typing import DefaultDict
 
@@ -34,13 +35,55 @@ def play(player_count: int, last_marble: int) -> int:
     return max(scores.values())
 
 
+def play_linked(player_count: int, last_marble: int) -> int:
+    """
+    Solves the marble problem like play but keeps the circle as a doubly
+    linked list, so placing and removing a marble takes constant time. The
+    links are stored in two arrays indexed by marble, which are allocated up
+    front and take 8 bytes per marble, rather than as a Python object per
+    marble.
+    """
+    following = array('i', [0]) * (last_marble + 1)  # Marble clockwise of marble
+    preceding = array('i', [0]) * (last_marble + 1)  # Marble counter-clockwise of marble
+    scores = array('q', [0]) * player_count
+    current = 0
+
+    for marble in range(1, last_marble + 1):
+
+        if marble % 23 != 0:
+            # Place the marble between the marbles 1 and 2 clockwise of current
+            left = following[current]
+            right = following[left]
+            following[left] = marble
+            preceding[marble] = left
+            following[marble] = right
+            preceding[right] = marble
+            current = marble
+        else:
+            removed = current
+            for _ in range(7):
+                removed = preceding[removed]
+            left, right = preceding[removed], following[removed]
+            following[left] = right
+            preceding[right] = left
+            scores[marble % player_count] += marble + removed
+            current = right
+
+    return max(scores)
+
+
 if __name__ == '__main__':
 
-    assert play(9, 25) == 32
-    assert play(10, 1618) == 8317
-    assert play(13, 7999) == 146373
-    assert play(17, 1104) == 2764
-    assert play(21, 6111) == 54718
-    assert play(30, 5807) == 37305
-    assert play(427, 70723) == 399745
-    assert play(427, 70723 * 100) == 3349098263
+    for solve in (play, play_linked):
+        assert solve(9, 25) == 32
+        assert solve(10, 1618) == 8317
+        assert solve(13, 7999) == 146373
+        assert solve(17, 1104) == 2764
+        assert solve(21, 6111) == 54718
+        assert solve(30, 5807) == 37305
+        assert solve(427, 70723) == 399745
+
+    # Inserting into the list makes play quadratic, so at 100x it would take well
+    # over ten minutes. Both engines are cross-checked at 2x instead.
+    assert play(427, 70723 * 2) == play_linked(427, 70723 * 2)
+    assert play_linked(427, 70723 * 100) == 3349098263
@@ -0,0 +1,732 @@
+import os
+import json
+import time
+import argparse
+
+from math import isqrt
+from collections import namedtuple, Counter
+from typing import Any, List, Dict, Callable, Iterable, Optional, Tuple
+
+Registers = List[int]
+Instruction = namedtuple('Instruction', 'a, b, c')
+
+"""
+A parsed elfcode program. The ip is the register the instruction pointer is
+bound to and instructions is a list of (opcode, a, b, c) tuples.
+"""
+Program = namedtuple('Program', 'ip, instructions')
+
+
+def addr(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = registers[op.a] + registers[op.b]
+    return registers
+
+
+def addi(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = registers[op.a] + op.b
+    return registers
+
+
+def mulr(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = registers[op.a] * registers[op.b]
+    return registers
+
+
+def muli(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = registers[op.a] * op.b
+    return registers
+
+
+def banr(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = registers[op.a] & registers[op.b]
+    return registers
+
+
+def bani(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = registers[op.a] & op.b
+    return registers
+
+
+def borr(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = registers[op.a] | registers[op.b]
+    return registers
+
+
+def bori(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = registers[op.a] | op.b
+    return registers
+
+
+def setr(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = registers[op.a]
+    return registers
+
+
+def seti(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = op.a
+    return registers
+
+
+def gtir(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = int(op.a > registers[op.b])
+    return registers
+
+
+def gtri(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = int(registers[op.a] > op.b)
+    return registers
+
+
+def gtrr(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = int(registers[op.a] > registers[op.b])
+    return registers
+
+
+def eqir(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = int(op.a == registers[op.b])
+    return registers
+
+
+def eqri(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = int(registers[op.a] == op.b)
+    return registers
+
+
+def eqrr(op: Instruction, registers: Registers) -> Registers:
+    registers[op.c] = int(registers[op.a] == registers[op.b])
+    return registers
+
+
+OPCODES: Dict[str, Callable] = {op.__name__: op for op in (
+    addr, addi, mulr, muli, banr, bani, borr, bori,
+    setr, seti, gtir, gtri, gtrr, eqir, eqri, eqrr
+)}
+
+"""
+Python expressions equivalent to each opcode. The register operands ra and rb
+are substituted with the names of the local variables holding the registers
+while a and b are substituted with the immediate values.
+"""
+EXPRESSIONS: Dict[str, str] = {
+    'addr': '{ra} + {rb}',
+    'addi': '{ra} + {b}',
+    'mulr': '{ra} * {rb}',
+    'muli': '{ra} * {b}',
+    'banr': '{ra} & {rb}',
+    'bani': '{ra} & {b}',
+    'borr': '{ra} | {rb}',
+    'bori': '{ra} | {b}',
+    'setr': '{ra}',
+    'seti': '{a}',
+    'gtir': '1 if {a} > {rb} else 0',
+    'gtri': '1 if {ra} > {b} else 0',
+    'gtrr': '1 if {ra} > {rb} else 0',
+    'eqir': '1 if {a} == {rb} else 0',
+    'eqri': '1 if {ra} == {b} else 0',
+    'eqrr': '1 if {ra} == {rb} else 0'
+}
+
+
+def parse_program(lines: List[str]) -> Program:
+    """
+    Parses an elfcode program which starts with an #ip declaration
+    """
+    ip = int(lines[0].split()[1])
+    instructions = []
+    for line in lines[1:]:
+        if not line.strip():
+            continue
+        op, *values = line.split()
+        if op not in OPCODES:
+            raise ValueError(f'Unknown opcode {op}')
+        a, b, c = (int(value) for value in values)
+        instructions.append((op, a, b, c))
+    return Program(ip, instructions)
+
+
+"""
+Hot loops which have a native equivalent are described as patterns of
+instructions. Operands which are names bind to registers, names starting with
+# bind to immediate values and operands like >8 are jumps to the address eight
+instructions after the start of the pattern. Integers have to match exactly
+and None matches anything. The name ip always binds to the instruction pointer.
+"""
+Pattern = List[Tuple[str, Any, Any, Any]]
+Native = Callable[[Registers], Optional[int]]
+
+COMMUTATIVE = ('addr', 'mulr', 'banr', 'borr', 'eqrr')
+
+# for i in range(i, n + 1): for j in range(1, n + 1): if i * j == n: acc += i
+DIVISOR_SUM: Pattern = [
+    ('seti', 1, None, 'j'),
+    ('mulr', 'i', 'j', 't'),
+    ('eqrr', 't', 'n', 't'),
+    ('addr', 't', 'ip', 'ip'),
+    ('addi', 'ip', 1, 'ip'),
+    ('addr', 'i', 'acc', 'acc'),
+    ('addi', 'j', 1, 'j'),
+    ('gtrr', 'j', 'n', 't'),
+    ('addr', 'ip', 't', 'ip'),
+    ('seti', '>1', None, 'ip'),
+    ('addi', 'i', 1, 'i'),
+    ('gtrr', 'i', 'n', 't'),
+    ('addr', 't', 'ip', 'ip'),
+    ('seti', '>0', None, 'ip')
+]
+
+# for j in range(j, n + 1): if i * j == n: acc += i
+DIVISOR_TEST: Pattern = [
+    ('mulr', 'i', 'j', 't'),
+    ('eqrr', 't', 'n', 't'),
+    ('addr', 't', 'ip', 'ip'),
+    ('addi', 'ip', 1, 'ip'),
+    ('addr', 'i', 'acc', 'acc'),
+    ('addi', 'j', 1, 'j'),
+    ('gtrr', 'j', 'n', 't'),
+    ('addr', 'ip', 't', 'ip'),
+    ('seti', '>0', None, 'ip')
+]
+
+# while (q + 1) * k <= x: q += 1
+DIVISION: Pattern = [
+    ('addi', 'q', 1, 't'),
+    ('muli', 't', '#k', 't'),
+    ('gtrr', 't', 'x', 't'),
+    ('addr', 't', 'ip', 'ip'),
+    ('addi', 'ip', 1, 'ip'),
+    ('seti', '>8', None, 'ip'),
+    ('addi', 'q', 1, 'q'),
+    ('seti', '>0', None, 'ip')
+]
+
+
+def divisor_sum(bindings: Dict[str, int], start: int) -> Optional[Native]:
+    """
+    Sums the divisors of n which are at least i in O(sqrt(n)) time instead of
+    executing the nested loops in O(n^2) time
+    """
+    i, j, n, t, acc, ip = (bindings[name] for name in ('i', 'j', 'n', 't', 'acc', 'ip'))
+
+    def native(registers: Registers) -> Optional[int]:
+        first, target = registers[i], registers[n]
+        if first < 1 or target < 1:
+            return None
+
+        divisors = set()
+        for divisor in range(1, isqrt(target) + 1):
+            if target % divisor == 0:
+                divisors.update((divisor, target // divisor))
+
+        registers[acc] += sum(divisor for divisor in divisors if divisor >= first)
+        registers[i] = max(first, target) + 1
+        registers[j] = target + 1
+        registers[t] = 1
+        registers[ip] = start + len(DIVISOR_SUM)
+
+        # Every inner loop runs n times and takes 8 instructions per iteration
+        iterations = registers[i] - first
+        return iterations * (1 + 8 * target - 1 + 4) - 1
+
+    return native
+
+
+def divisor_test(bindings: Dict[str, int], start: int) -> Optional[Native]:
+    """
+    Checks whether i divides n with a single modulo instead of trying every
+    j until n
+    """
+    i, j, n, t, acc, ip = (bindings[name] for name in ('i', 'j', 'n', 't', 'acc', 'ip'))
+
+    def native(registers: Registers) -> Optional[int]:
+        first, target = registers[j], registers[n]
+        if registers[i] < 1 or target < 1:
+            return None
+
+        if target % registers[i] == 0 and target // registers[i] >= first:
+            registers[acc] += registers[i]
+        registers[j] = max(first, target) + 1
+        registers[t] = 1
+        registers[ip] = start + len(DIVISOR_TEST)
+        return 8 * (registers[j] - first) - 1
+
+    return native
+
+
+def division(bindings: Dict[str, int], start: int) -> Optional[Native]:
+    """
+    Computes the quotient with integer division instead of counting upwards
+    """
+    q, t, x, k, ip = (bindings[name] for name in ('q', 't', 'x', '#k', 'ip'))
+    if k <= 0:
+        return None
+
+    def native(registers: Registers) -> Optional[int]:
+        first = registers[q]
+        registers[q] = max(first, registers[x] // k)
+        registers[t] = 1
+        registers[ip] = start + len(DIVISION)
+        return 7 * (registers[q] - first) + 5
+
+    return native
+
+
+IDIOMS: List[Tuple[Pattern, Callable]] = [
+    (DIVISOR_SUM, divisor_sum),
+    (DIVISOR_TEST, divisor_test),
+    (DIVISION, division)
+]
+
+
+def match(pattern: Pattern, program: Program, start: int) -> Optional[Dict[str, int]]:
+    """
+    Matches the pattern against the program at the address and returns the
+    bindings of the pattern operands or None if the pattern does not match
+    """
+    if start + len(pattern) > len(program.instructions):
+        return None
+
+    bindings = {'ip': program.ip}
+    for offset, (expected_op, *expected) in enumerate(pattern):
+        op, a, b, c = program.instructions[start + offset]
+        if op != expected_op:
+            return None
+
+        orders = [(a, b, c), (b, a, c)] if op in COMMUTATIVE else [(a, b, c)]
+        for operands in orders:
+            candidate = dict(bindings)
+            for name, value in zip(expected, operands):
+                if name is None:
+                    continue
+                elif isinstance(name, int):
+                    if value != name:
+                        break
+                elif name.startswith('>'):
+                    if value + 1 != start + int(name[1:]):
+                        break
+                elif candidate.setdefault(name, value) != value:
+                    break
+            else:
+                bindings = candidate
+                break
+        else:
+            return None
+
+    # Every name has to refer to a different register
+    registers = [value for name, value in bindings.items() if not name.startswith('#')]
+    if len(set(registers)) != len(registers):
+        return None
+    return bindings
+
+
+def find_idioms(program: Program, exclude: Iterable[int] = ()) -> Dict[int, Native]:
+    """
+    Finds the loop idioms in the program and returns their native equivalents
+    by the address of the loop. Loops which contain any of the excluded
+    addresses, e.g. breakpoints, are not replaced.
+    """
+    exclude = set(exclude)
+    idioms: Dict[int, Native] = {}
+    for start in range(len(program.instructions)):
+        for pattern, factory in IDIOMS:
+            bindings = match(pattern, program, start)
+            if bindings is None or exclude.intersection(range(start + 1, start + len(pattern))):
+                continue
+            native = factory(bindings, start)
+            if native is not None:
+                idioms[start] = native
+                break
+    return idioms
+
+
+class Profile:
+    """
+    Execution statistics of an elfcode program.
+
+    The statistics are gathered per executed block rather than per executed
+    instruction to keep the overhead low. Since the instructions in a compiled
+    block are known in advance, the instruction counts, register writes and
+    jumps within blocks are derived from the block counts afterwards.
+    """
+    def __init__(self, program: Program) -> None:
+        self.program = program
+        self.exits: Counter = Counter()  # Jumps from the end of a block
+        self.native: Counter = Counter()  # Instructions executed natively by idiom
+        self._blocks: List[Tuple[Tuple[int, ...], List[int]]] = []
+
+    def instrument(self, block: Callable, trace: Tuple[int, ...]) -> Callable:
+        """
+        Wraps a compiled block which executes the addresses in the trace
+        """
+        hits = [0]
+        self._blocks.append((trace, hits))
+        exits = self.exits
+        ip = self.program.ip
+        last = trace[-1]
+
+        def profiled(registers: Registers) -> int:
+            executed = block(registers)
+            hits[0] += 1
+            exits[(last, registers[ip])] += 1
+            return executed
+
+        return profiled
+
+    def instrument_native(self, native: Native, start: int) -> Native:
+        """
+        Wraps the native equivalent of the loop starting at the address
+        """
+        def profiled(registers: Registers) -> Optional[int]:
+            executed = native(registers)
+            if executed is not None:
+                self.native[start] += executed
+            return executed
+
+        return profiled
+
+    def instruction_counts(self) -> Counter:
+        """Returns how many times each address was executed"""
+        counts: Counter = Counter()
+        for trace, (hits, ) in self._blocks:
+            for address in trace:
+                counts[address] += hits
+        return counts
+
+    def register_writes(self) -> Counter:
+        """Returns how many times each register was written to"""
+        writes: Counter = Counter()
+        for address, count in self.instruction_counts().items():
+            writes[self.program.instructions[address][3]] += count
+        return writes
+
+    def back_edges(self) -> Counter:
+        """
+        Returns how many times each backwards jump, i.e. the end of a loop
+        iteration, was taken as a Counter of (source, target) addresses
+        """
+        edges: Counter = Counter()
+        for trace, (hits, ) in self._blocks:
+            for source, target in zip(trace, trace[1:]):
+                if target <= source:
+                    edges[(source, target)] += hits
+        for (source, target), count in self.exits.items():
+            if target <= source:
+                edges[(source, target)] += count
+        return edges
+
+    def hot_loops(self) -> List[Tuple[int, int, int, int]]:
+        """
+        Returns the loops ranked by the amount of instructions executed within
+        them as a list of (start, end, iterations, instructions) tuples
+        """
+        counts = self.instruction_counts()
+        loops = []
+        for (source, target), iterations in self.back_edges().items():
+            instructions = sum(counts[address] for address in range(target, source + 1))
+            loops.append((target, source, iterations, instructions))
+        return sorted(loops, key=lambda loop: loop[3], reverse=True)
+
+    def report(self, limit: int = 10) -> str:
+        """
+        Returns a human-readable report of the hot loops, the most executed
+        instructions and the register writes
+        """
+        counts = self.instruction_counts()
+        total = sum(counts.values()) + sum(self.native.values())
+        lines = [f'Executed {total} instructions', '', 'Hot loops:']
+
+        for start, end, iterations, instructions in self.hot_loops()[:limit]:
+            share = 100 * instructions / total if total else 0
+            lines.append(f'  {start:>4} - {end:<4} {iterations:>14} iterations '
+                         f'{instructions:>16} instructions {share:6.2f}%')
+        for start, instructions in self.native.most_common():
+            share = 100 * instructions / total if total else 0
+            lines.append(f'  {start:>4} (native) {instructions:>42} instructions '
+                         f'{share:6.2f}%')
+
+        lines += ['', 'Hot instructions:']
+        for address, count in counts.most_common(limit):
+            op, a, b, c = self.program.instructions[address]
+            lines.append(f'  {address:>4} {op} {a} {b} {c:<18} {count:>16}')
+
+        lines += ['', 'Register writes:']
+        for register, count in sorted(self.register_writes().items()):
+            lines.append(f'  r{register} {count:>16}')
+
+        return '\n'.join(lines)
+
+
+class Checkpoint:
+    """
+    Saves snapshots of a long execution to a JSON file at an interval so the
+    execution can be resumed after it has been interrupted. The file is
+    replaced atomically, so an interruption while saving leaves the previous
+    snapshot intact.
+    """
+    def __init__(self, path: str, interval: float = 60.0) -> None:
+        self.path = path
+        self.interval = interval  # Seconds between snapshots
+        self._saved = time.monotonic()
+
+    def due(self) -> bool:
+        """Indicates whether the interval has passed since the last snapshot"""
+        return time.monotonic() - self._saved >= self.interval
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Returns the last snapshot or None if nothing has been saved yet"""
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, snapshot: Dict[str, Any]) -> None:
+        """Replaces the last snapshot with the given one"""
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+        self._saved = time.monotonic()
+
+
+class Machine:
+    """
+    Executes elfcode programs by compiling them into Python functions.
+
+    Each function executes a block of straight-line instructions using local
+    variables as registers, i.e. a block ends at the first instruction which
+    writes to the instruction pointer. Blocks which end with a jump to a
+    constant address carry on compiling at the jump target so tight loops
+    are dispatched as few times as possible. Blocks are compiled lazily the
+    first time execution reaches them.
+
+    Execution can be suspended at breakpoints, i.e. run() returns before the
+    instruction at a breakpoint is executed, and continues from the
+    breakpoint the next time run() is called.
+
+    Unless idioms are disabled, loops which match one of the known idioms are
+    executed natively whenever execution reaches the start of the loop.
+
+    If profiling is enabled, execution statistics are gathered to the profile.
+    """
+    def __init__(self,
+                 program: Program,
+                 registers: Optional[Registers] = None,
+                 breakpoints: Iterable[int] = (),
+                 idioms: bool = True,
+                 profile: bool = False) -> None:
+        self.program = program
+        self.registers = list(registers) if registers else [0] * 6
+        self.breakpoints = frozenset(breakpoints)
+        self.executed = 0  # Amount of instructions executed so far
+        self.profile = Profile(program) if profile else None
+        self._idioms = find_idioms(program, self.breakpoints) if idioms else {}
+        self._boundaries = self.breakpoints | set(self._idioms)
+        self._blocks: Dict[int, Callable] = {}
+
+        for op, a, b, c in program.instructions:
+            operands = [c]
+            if op not in ('seti', 'gtir', 'eqir'):
+                operands.append(a)
+            if op in ('addr', 'mulr', 'banr', 'borr', 'gtir', 'gtrr', 'eqir', 'eqrr'):
+                operands.append(b)
+            if any(not 0 <= operand < len(self.registers) for operand in operands):
+                raise ValueError(f'Invalid register in {op} {a} {b} {c}')
+
+    @property
+    def ip(self) -> int:
+        """Returns the address of the next instruction to execute"""
+        return self.registers[self.program.ip]
+
+    @property
+    def halted(self) -> bool:
+        """Indicates whether the instruction pointer has left the program"""
+        return not 0 <= self.ip < len(self.program.instructions)
+
+    def step(self) -> None:
+        """
+        Executes a single instruction without compiling or profiling it
+        """
+        op, a, b, c = self.program.instructions[self.ip]
+        OPCODES[op](Instruction(a, b, c), self.registers)
+        self.registers[self.program.ip] += 1
+        self.executed += 1
+
+    def run(self, limit: Optional[int] = None) -> bool:
+        """
+        Runs the program until it either halts, reaches a breakpoint or has
+        executed at least the limit of instructions. Returns True if the
+        program halted and False otherwise.
+        """
+        registers = self.registers
+        ip = self.program.ip
+        size = len(self.program.instructions)
+        breakpoints = self.breakpoints
+        blocks = self._blocks
+        executed = 0
+
+        try:
+            while 0 <= registers[ip] < size:
+                try:
+                    block = blocks[registers[ip]]
+                except KeyError:
+                    block = blocks[registers[ip]] = self._block(registers[ip])
+                executed += block(registers)
+                if registers[ip] in breakpoints:
+                    return False
+                if limit is not None and executed >= limit:
+                    return False
+        finally:
+            self.executed += executed
+        return True
+
+    def run_checkpointed(self, checkpoint: Checkpoint, chunk: int = 10 ** 7) -> bool:
+        """
+        Runs the program like run() but saves a snapshot of the machine to the
+        checkpoint whenever one is due and once the program stops. The
+        checkpoint is checked after every chunk of instructions.
+        """
+        while True:
+            halted = self.run(chunk)
+            stopped = halted or self.ip in self.breakpoints
+            if stopped or checkpoint.due():
+                checkpoint.save(self.snapshot())
+            if stopped:
+                return halted
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the state of the machine as a JSON serializable dict"""
+        return {
+            'ip': self.ip,
+            'registers': list(self.registers),
+            'executed': self.executed
+        }
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        """Restores the machine to a state returned by snapshot()"""
+        if len(snapshot['registers']) != len(self.registers):
+            raise ValueError('Snapshot has a different amount of registers')
+        self.registers[:] = snapshot['registers']
+        self.registers[self.program.ip] = snapshot['ip']
+        self.executed = snapshot['executed']
+
+    def _block(self, start: int) -> Callable:
+        """
+        Returns a function which executes the block starting at the address
+        and returns the amount of instructions it executed. Loop idioms fall
+        back to the compiled block if the native version declines to run.
+        """
+        compiled, trace = self._compile(start)
+        if self.profile is not None:
+            compiled = self.profile.instrument(compiled, trace)
+        if start not in self._idioms:
+            return compiled
+
+        native = self._idioms[start]
+        if self.profile is not None:
+            native = self.profile.instrument_native(native, start)
+
+        def idiom(registers: Registers) -> int:
+            executed = native(registers)
+            return compiled(registers) if executed is None else executed
+
+        return idiom
+
+    def _compile(self, start: int) -> Tuple[Callable, Tuple[int, ...]]:
+        """
+        Compiles the block starting at the address into a Python function and
+        returns the function and the addresses it executes in order
+        """
+        ip = self.program.ip
+        instructions = self.program.instructions
+        names = ', '.join(f'r{i}' for i in range(len(self.registers)))
+
+        def operand(register: int, address: int) -> str:
+            # The instruction pointer register always holds the address of
+            # the instruction being executed within a block
+            return str(address) if register == ip else f'r{register}'
+
+        body: List[str] = []
+        written = {ip}
+        trace: List[int] = []
+        address = start
+        while 0 <= address < len(instructions) and address not in trace:
+            trace.append(address)
+            op, a, b, c = instructions[address]
+            expression = EXPRESSIONS[op].format(a=a, b=b,
+                                                ra=operand(a, address),
+                                                rb=operand(b, address))
+            written.add(c)
+            address += 1
+
+            if c != ip:
+                body.append(f'r{c} = {expression}')
+                if address in self._boundaries:
+                    break
+                continue
+
+            # Follow jumps to constant addresses, otherwise end the block
+            try:
+                target = eval(expression, {}) + 1
+            except NameError:
+                body.append(f'r{ip} = ({expression}) + 1')
+                address = None
+                break
+            if target in self._boundaries:
+                address = target
+                break
+            address = target
+
+        if address is not None:
+            body.append(f'r{ip} = {address}')
+
+        stores = '\n    '.join(f'registers[{r}] = r{r}' for r in sorted(written))
+        source = (f'def block(registers):\n'
+                  f'    {names} = registers\n'
+                  f'    ' + '\n    '.join(body) + '\n'
+                  f'    {stores}\n'
+                  f'    return {len(trace)}\n')
+        namespace: Dict = {}
+        exec(source, namespace)
+        return namespace['block'], tuple(trace)
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Profile an elfcode program')
+    parser.add_argument('program', help='path to the program')
+    parser.add_argument('registers', nargs='*', type=int,
+                        help='initial values of the first registers, the rest are zeroes')
+    parser.add_argument('-l', '--limit', type=int,
+                        help='amount of instructions to execute at most')
+    parser.add_argument('-n', '--no-idioms', action='store_true',
+                        help='execute recognized loops instruction by instruction')
+    parser.add_argument('-r', '--rows', type=int, default=10,
+                        help='amount of rows per section in the report')
+    parser.add_argument('-c', '--checkpoint',
+                        help='file to save the machine to and resume it from')
+    parser.add_argument('-i', '--interval', type=float, default=60.0,
+                        help='seconds between checkpoints')
+    args = parser.parse_args()
+    if args.checkpoint and args.limit:
+        parser.error('a limit cannot be used together with a checkpoint')
+    if len(args.registers) > 6:
+        parser.error('the machine only has 6 registers')
+
+    with open(args.program) as f:
+        program = parse_program(f.read().splitlines())
+    registers = args.registers + [0] * (6 - len(args.registers))
+    machine = Machine(program, registers,
+                      idioms=not args.no_idioms, profile=True)
+    if args.checkpoint:
+        # The profile only covers the execution since the machine was resumed
+        checkpoint = Checkpoint(args.checkpoint, args.interval)
+        snapshot = checkpoint.load()
+        if snapshot is not None:
+            machine.restore(snapshot)
+        halted = machine.run_checkpointed(checkpoint)
+    else:
+        halted = machine.run(args.limit)
+    print(machine.profile.report(args.rows))
+    print(f'\n{"Halted" if halted else "Stopped"} with registers {machine.registers}')
@@ -0,0 +1,158 @@
+import os
+import sys
+import io
+import re
+import json
+import time
+import runpy
+import argparse
+import resource
+import contextlib
+import traceback
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_REPORT = os.path.join(ROOT, 'report.json')
+
+Result = Dict[str, Any]
+
+
+def discover_days() -> List[int]:
+    """
+    Returns the numbers of all the day modules in the repository in
+    ascending order
+    """
+    days = []
+    for filename in os.listdir(ROOT):
+        match = re.fullmatch(r'day(\d+)\.py', filename)
+        if match:
+            days.append(int(match.group(1)))
+    return sorted(days)
+
+
+def cpu_time() -> float:
+    """
+    Returns the CPU time used by the current process and all of its
+    terminated children, e.g. the process pools some of the days spawn
+    """
+    return sum(usage.ru_utime + usage.ru_stime for usage in (
+        resource.getrusage(resource.RUSAGE_SELF),
+        resource.getrusage(resource.RUSAGE_CHILDREN)))
+
+
+def run_day(day: int) -> Result:
+    """
+    Runs the __main__ block of a single day module and returns a report of
+    how the run went.
+
+    The module is executed from the repository root so that the relative
+    paths to the inputs resolve just like when running the module directly.
+    Anything the module prints is swallowed to keep the runner output clean.
+    Peak RSS is only meaningful per day because every day is executed in a
+    fresh worker process. Both the CPU time and peak RSS include the child
+    processes the day has waited for.
+    """
+    os.chdir(ROOT)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    status = 'pass'
+    error: Optional[str] = None
+
+    wall_start = time.perf_counter()
+    cpu_start = cpu_time()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            runpy.run_path(f'day{day}.py', run_name='__main__')
+    except AssertionError:
+        status = 'fail'
+        error = traceback.format_exc()
+    except Exception:
+        status = 'error'
+        error = traceback.format_exc()
+    wall_time = time.perf_counter() - wall_start
+    cpu_used = cpu_time() - cpu_start
+
+    # ru_maxrss is reported in kilobytes on Linux and for the children it is
+    # the peak of the largest child rather than a sum
+    peak_rss = max(resource.getrusage(who).ru_maxrss for who in (
+        resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)) * 1024
+
+    return {
+        'day': day,
+        'status': status,
+        'wall_time': wall_time,
+        'cpu_time': cpu_used,
+        'peak_rss': peak_rss,
+        'error': error
+    }
+
+
+def previous_wall_times(report_path: str) -> Dict[int, float]:
+    """
+    Returns the wall times of the days from a previous report if one exists
+    """
+    try:
+        with open(report_path) as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {result['day']: result['wall_time'] for result in report['days']}
+
+
+def run_days(days: List[int],
+             workers: Optional[int] = None,
+             report_path: str = DEFAULT_REPORT) -> List[Result]:
+    """
+    Runs the given days across a process pool and returns the results
+    ordered by day.
+
+    The days which took the longest during the previous run are submitted
+    first so the slowest days start right away and the whole run is bounded
+    by the slowest day rather than the sum of all days.
+    """
+    previous = previous_wall_times(report_path)
+    ordered = sorted(days, key=lambda day: previous.get(day, 0.0), reverse=True)
+
+    results: List[Result] = []
+    # Each worker handles only a single day so peak RSS is reported per day.
+    # max_tasks_per_child requires Python 3.11 and makes the pool spawn its
+    # workers instead of forking them.
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             max_tasks_per_child=1) as executor:
+        futures = [executor.submit(run_day, day) for day in ordered]
+        for future in as_completed(futures):
+            result = future.result()
+            print(f"day{result['day']:<3} {result['status']:<6} "
+                  f"{result['wall_time']:8.2f}s wall "
+                  f"{result['cpu_time']:8.2f}s cpu "
+                  f"{result['peak_rss'] / 2 ** 20:8.1f} MiB")
+            results.append(result)
+
+    return sorted(results, key=lambda result: result['day'])
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Run all the days at once')
+    parser.add_argument('days', nargs='*', type=int,
+                        help='days to run, defaults to all of them')
+    parser.add_argument('-w', '--workers', type=int,
+                        help='size of the process pool, defaults to the CPU count')
+    parser.add_argument('-o', '--output', default=DEFAULT_REPORT,
+                        help='path to the JSON report')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_days(args.days or discover_days(), args.workers, args.output)
+    elapsed = time.perf_counter() - start
+
+    with open(args.output, 'w') as f:
+        json.dump({'wall_time': elapsed, 'days': results}, f, indent=2)
+
+    failed = [result['day'] for result in results if result['status'] != 'pass']
+    print(f'Ran {len(results)} days in {elapsed:.2f}s, {len(failed)} failed')
+    sys.exit(1 if failed else 0)